@@ -5,10 +5,21 @@
     FrameHeader,
     PendingCommand,
     ResponseEnvelope,
+    RetryPolicy,
 )
+from .batch import BatchResult, CommandBatch
+from .cache import ResponseCache
+from .correlation import CorrelationIndex, SequenceAllocator
+from .events import EventBus, Subscription
+from .futures import CommandError, CommandTimeout, gather, gather_async
+from .hotplug import HotplugWatcher
+from .pool import SerialPool
+from .probe import PortProber
 from .registry import COMMANDS, get_command
 from .serial_manager import SerialManager
 from .service import SerialCommandService
+from .stream import ResponseStream
+from .timers import DeadlineScheduler, TimerWheel
 
 __all__ = [
     "CommandField",
@@ -17,8 +28,26 @@ __all__ = [
     "FrameHeader",
     "PendingCommand",
     "ResponseEnvelope",
+    "RetryPolicy",
+    "BatchResult",
+    "CommandBatch",
+    "ResponseCache",
+    "CorrelationIndex",
+    "SequenceAllocator",
+    "EventBus",
+    "Subscription",
+    "CommandError",
+    "CommandTimeout",
+    "gather",
+    "gather_async",
     "COMMANDS",
     "get_command",
     "SerialManager",
+    "HotplugWatcher",
+    "PortProber",
+    "SerialPool",
     "SerialCommandService",
+    "ResponseStream",
+    "DeadlineScheduler",
+    "TimerWheel",
 ]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple
+
+from .futures import gather
+from .models import PendingCommand, ResponseEnvelope
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .service import SerialCommandService
+
+
+class BatchResult:
+    """Resultado agregado de un lote: un future por comando, en el orden de alta.
+
+    ``future`` resuelve cuando todos terminaron, con la lista de respuestas o
+    excepciones (``CommandError``/``CommandTimeout``) en el mismo orden.
+    """
+
+    def __init__(
+        self,
+        commands: List[PendingCommand],
+        futures: List["Future[Optional[ResponseEnvelope]]"],
+        bytes_written: int,
+    ) -> None:
+        self.commands = commands
+        self.futures = futures
+        self.bytes_written = bytes_written  # lo que salió en la escritura única
+        self.future: "Future[List[Any]]" = gather(futures, return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def outcomes(self) -> List[Tuple[PendingCommand, Any]]:
+        """Pares (comando, respuesta o excepción); sólo con el lote terminado."""
+        return list(zip(self.commands, self.future.result(timeout=0)))
+
+    def failed(self) -> List[Tuple[PendingCommand, BaseException]]:
+        return [(cmd, out) for cmd, out in self.outcomes() if isinstance(out, BaseException)]
+
+    @property
+    def ok(self) -> bool:
+        return self.done() and not self.failed()
+
+
+class CommandBatch:
+    """Acumula comandos y los envía codificados en una sola escritura.
+
+    Uso::
+
+        with service.batch() as batch:
+            for name, body in templates.items():
+                batch.add("NTF.TEMPLATE.SET", [name], {"BODY": body})
+        batch.result.future.add_done_callback(...)
+
+    Al salir del ``with`` (sin excepción) se llama a ``submit``. Los comandos
+    que no entran en la ventana del servicio quedan en su cola como cualquier
+    ``send``.
+    """
+
+    def __init__(self, service: "SerialCommandService") -> None:
+        self._service = service
+        self._items: List[tuple] = []
+        self.result: Optional[BatchResult] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(
+        self,
+        command_name: str,
+        positional: Optional[Iterable[str]] = None,
+        keyword: Optional[dict] = None,
+        *,
+        password: Optional[str] = None,
+        timestamp: Optional[int] = None,
+        sequence: Optional[int] = None,
+        device_id: Optional[str] = None,
+    ) -> "CommandBatch":
+        if self.result is not None:
+            raise RuntimeError("El lote ya fue enviado")
+        self._items.append((command_name, positional, keyword, password, timestamp, sequence, device_id))
+        return self
+
+    def submit(self) -> BatchResult:
+        if self.result is None:
+            self.result = self._service._submit_batch(self._items)
+        return self.result
+
+    def __enter__(self) -> "CommandBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.submit()
+
+
+__all__ = ["BatchResult", "CommandBatch"]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from .models import ResponseEnvelope
+
+CacheKey = Tuple[str, str, Tuple[str, ...], Tuple[Tuple[str, str], ...]]
+
+
+def cache_key(
+    device_id: str,
+    command_name: str,
+    positional: Iterable[str] = (),
+    keyword: Optional[Mapping[str, str]] = None,
+) -> CacheKey:
+    """Clave (equipo, comando, argumentos); el orden de los keyword no importa."""
+    return (device_id, command_name, tuple(positional), tuple(sorted((keyword or {}).items())))
+
+
+class ResponseCache:
+    """Respuestas de consultas de sólo lectura con TTL por entrada y desalojo LRU.
+
+    Un índice secundario por (equipo, comando) permite invalidar todas las
+    variantes de argumentos de una consulta cuando un comando relacionado
+    modifica el estado del equipo.
+    """
+
+    def __init__(self, max_entries: int = 256, clock: Callable[[], float] = time.monotonic) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser positivo")
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, ResponseEnvelope]]" = OrderedDict()
+        self._by_command: Dict[Tuple[str, str], Set[CacheKey]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[ResponseEnvelope]:
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires, response = item
+        if self._clock() >= expires:
+            self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: CacheKey, response: ResponseEnvelope, ttl_ms: int) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        else:
+            self._by_command.setdefault(key[:2], set()).add(key)
+        self._entries[key] = (self._clock() + ttl_ms / 1000.0, response)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def invalidate(self, device_id: str, command_names: Iterable[str]) -> int:
+        """Descarta las respuestas cacheadas de esos comandos para el equipo."""
+        dropped = 0
+        for name in command_names:
+            for key in self._by_command.pop((device_id, name), ()):
+                self._entries.pop(key, None)
+                dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_command.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _discard(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_command.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_command[key[:2]]
+
+
+__all__ = ["CacheKey", "ResponseCache", "cache_key"]
@@ -1,10 +1,10 @@
 ﻿from __future__ import annotations
 
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from app.core import qc1_proto
 
-from .models import CommandFrame, FrameHeader, ResponseEnvelope
+from .models import CommandFrame, FrameHeader, ResponseBatch, ResponseEnvelope
 
 
 def encode_command(frame: CommandFrame) -> str:
@@ -44,25 +44,163 @@ def encode_from_parts(
     )
 
 
-def decode_response(line: str) -> ResponseEnvelope:
-    resp = qc1_proto.parse_response(line)
-    return ResponseEnvelope(
-        raw_line=line,
-        prefix=resp.prefix,
-        device=resp.dev,
-        sequence=resp.seq,
-        timestamp=resp.ts,
-        fields=list(resp.fields),
-    )
+_BOUND_PASSWORD = object()
+
+# "%04d," de cada secuencia junto a su XOR; se llena a demanda (max. 10 000)
+_SEQ_FIELDS: Dict[int, Tuple[bytes, int]] = {}
+
+
+def _seq_field(seq: int) -> Tuple[bytes, int]:
+    hit = _SEQ_FIELDS.get(seq)
+    if hit is None:
+        raw = b"%04d," % seq
+        hit = (raw, qc1_proto.QC1Checksum(raw).value)
+        if 0 <= seq < 10_000:
+            _SEQ_FIELDS[seq] = hit
+    return hit
+
+
+class CommandEncoder:
+    """Codificador precompilado ligado a (modelo, equipo, contraseña).
+
+    El prefijo ``QC1,<model>,<dev>,``, el sufijo ``,PWD=...`` y las secuencias
+    ``%04d`` se formatean una sola vez junto con su XOR; por comando sólo se
+    arma y pliega la parte variable (ts, nombre y argumentos). Produce los mismos
+    bytes que ``qc1_proto.build_command`` listos para escribir en el puerto.
+    """
+
+    def __init__(self, model: str, device_id: str, password: Optional[str] = None) -> None:
+        self.model = model
+        self.device_id = device_id
+        self._prefix = f"{qc1_proto.QC1_SIGNATURE},{model},{device_id},".encode("ascii")
+        self._prefix_xor = qc1_proto.QC1Checksum(self._prefix).value
+        self._suffixes: Dict[Optional[str], Tuple[bytes, int]] = {None: (b"", 0)}
+        if password is not None:
+            self._suffix(password)
+        self.password = password
+
+    def _suffix(self, password: Optional[str]) -> Tuple[bytes, int]:
+        hit = self._suffixes.get(password)
+        if hit is None:
+            if not qc1_proto.validate_pwd(password):
+                raise ValueError("PWD must be digits length 6..10")
+            raw = f",PWD={password}".encode("ascii")
+            hit = self._suffixes[password] = (raw, qc1_proto.QC1Checksum(raw).value)
+        return hit
+
+    def encode(
+        self,
+        sequence: int,
+        timestamp: int,
+        command_name: str,
+        positional: Iterable[str] = (),
+        keyword: Optional[dict] = None,
+        *,
+        password: Optional[str] = _BOUND_PASSWORD,  # type: ignore[assignment]
+    ) -> bytes:
+        """Arma el frame completo (con checksum y CRLF). ``password=None`` lo omite."""
+        pwd = self.password if password is _BOUND_PASSWORD else password
+        suffix, suffix_xor = self._suffix(pwd)
+        seq_raw, seq_xor = _seq_field(sequence)
+        parts = [str(timestamp), command_name]
+        parts += map(str, positional)
+        if keyword:
+            parts += [f"{k}={v}" for k, v in keyword.items()]
+        body = ",".join(parts).encode("ascii")
+        cs = self._prefix_xor ^ seq_xor ^ qc1_proto.QC1Checksum(body).value ^ suffix_xor
+        return b"".join((self._prefix, seq_raw, body, suffix, b"*%02X\r\n" % cs))
+
+    def encode_frame(self, frame: CommandFrame) -> bytes:
+        """Equivalente a ``encode_command`` pero devuelve bytes usando el prefijo cacheado."""
+        header = frame.header
+        if header.model != self.model or header.device_id != self.device_id:
+            return encode_command(frame).encode("ascii")
+        frame.validate()
+        kv = {f.name: frame.keyword[f.name] for f in frame.spec.keyword if f.name in frame.keyword}
+        return self.encode(
+            header.sequence,
+            header.timestamp,
+            frame.spec.name,
+            frame.positional,
+            kv,
+            password=header.password,
+        )
 
 
-def decode_packet(line: str) -> qc1_proto.QC1Packet:
+def decode_response(line: Union[str, qc1_proto.BytesLike]) -> ResponseEnvelope:
+    """Acepta la linea ya decodificada o el frame crudo tal como llega del puerto.
+
+    Los campos se resuelven de forma perezosa (ver ResponseEnvelope).
+    """
+    if not isinstance(line, str):
+        line = _ascii_line(line)
+    return ResponseEnvelope.from_response(qc1_proto.parse_response(line), line)
+
+
+def decode_buffer(data: qc1_proto.BytesLike, *, skip_errors: bool = True) -> ResponseBatch:
+    """Decodifica un volcado completo de respuestas (OK/ERR/EVT) a columnas.
+
+    Cada línea (separada por LF) se verifica con su checksum, y ``seq``/``ts``
+    deben entrar en sus columnas (uint16/int64). Con ``skip_errors`` las
+    inválidas se anotan en ``batch.errors`` (índice de línea) y se omiten; si
+    no, se lanza ``QC1ParseError`` indicando la línea.
+    """
+    buf = bytes(data)
+    batch = ResponseBatch(buf)
+    scan = qc1_proto.scan_response
+    n = len(buf)
+    pos = line = 0
+    while pos < n:
+        nl = buf.find(b"\n", pos)
+        if nl == -1:
+            nl = n
+        if nl > pos and not (nl - pos == 1 and buf[pos] == 13):
+            try:
+                prefix, dev, seq, ts, start, end = scan(buf, pos, nl)
+                # valida rangos/capacidad antes de escribir columnas: no quedan desalineadas
+                batch.append(line, prefix, dev, seq, ts, start, end)
+            except (qc1_proto.QC1ParseError, ValueError) as exc:
+                if not skip_errors:
+                    raise qc1_proto.QC1ParseError(f"line {line}: {exc}") from exc
+                batch.errors.append(line)
+        pos = nl + 1
+        line += 1
+    return batch
+
+
+def decode_many(lines: Iterable[Union[str, bytes]], *, skip_errors: bool = True) -> ResponseBatch:
+    """Como ``decode_buffer`` pero a partir de líneas sueltas (str o bytes).
+
+    Los índices de ``line_index``/``errors`` corresponden a la posición en ``lines``.
+    """
+    raw = [
+        (item.encode("ascii", errors="replace") if isinstance(item, str) else bytes(item)).rstrip(b"\r\n")
+        for item in lines
+    ]
+    return decode_buffer(b"\n".join(raw), skip_errors=skip_errors)
+
+
+def decode_packet(line: Union[str, qc1_proto.BytesLike]) -> qc1_proto.QC1Packet:
+    if not isinstance(line, str):
+        line = _ascii_line(line)
     return qc1_proto.parse_line(line)
 
 
+def _ascii_line(data: qc1_proto.BytesLike) -> str:
+    # Frame por frame el parser str es tan rápido como el de bytes: el costo es
+    # el XOR del checksum, igual en ambos (ver bench/bench_parse.py)
+    try:
+        return bytes(data).decode("ascii").rstrip("\r\n")
+    except UnicodeDecodeError:
+        raise qc1_proto.QC1ParseError("non-ascii payload") from None
+
+
 __all__ = [
+    "CommandEncoder",
     "encode_command",
     "encode_from_parts",
     "decode_response",
+    "decode_buffer",
+    "decode_many",
     "decode_packet",
 ]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Dict, Generic, Iterator, Optional, Set, Tuple, TypeVar
+
+SEQ_MIN = 1
+SEQ_MAX = 9999  # rango aceptado por qc1_proto.parse_line
+
+CorrelationKey = Tuple[str, int]  # (device_id, secuencia)
+T = TypeVar("T")
+
+
+class SequenceAllocator:
+    """Secuencias QC1 por equipo, sin repetir las que siguen reservadas.
+
+    Cada equipo tiene su propio contador circular ``SEQ_MIN..SEQ_MAX`` (nunca
+    0). Una secuencia queda reservada desde que se asigna hasta ``release``,
+    así que tampoco se reutiliza la de un comando que aún espera en cola.
+    """
+
+    def __init__(self, first: int = SEQ_MIN, last: int = SEQ_MAX) -> None:
+        if not 0 < first <= last:
+            raise ValueError("Rango de secuencias inválido")
+        self._first = first
+        self._last = last
+        self._last_issued: Dict[str, int] = {}
+        self._reserved: Dict[str, Set[int]] = {}
+
+    def peek(self, device_id: str) -> int:
+        """La secuencia que devolvería ``allocate``, sin reservarla."""
+        reserved = self._reserved.get(device_id, ())
+        span = self._last - self._first + 1
+        if len(reserved) >= span:
+            raise RuntimeError(f"Sin secuencias libres para {device_id}")
+        seq = self._last_issued.get(device_id, self._last)
+        while True:
+            seq = seq + 1 if seq < self._last else self._first
+            if seq not in reserved:
+                return seq
+
+    def allocate(self, device_id: str) -> int:
+        seq = self.peek(device_id)
+        self._last_issued[device_id] = seq
+        self._reserved.setdefault(device_id, set()).add(seq)
+        return seq
+
+    def reserve(self, device_id: str, seq: int) -> None:
+        """Marca como usada una secuencia elegida por el llamador.
+
+        ``ValueError`` si ya está reservada: dos comandos vivos con el mismo
+        ``(device_id, secuencia)`` no se podrían distinguir al responder.
+        """
+        reserved = self._reserved.setdefault(device_id, set())
+        if seq in reserved:
+            raise ValueError(f"Secuencia {seq} ya en uso para {device_id}")
+        reserved.add(seq)
+
+    def release(self, device_id: str, seq: int) -> None:
+        reserved = self._reserved.get(device_id)
+        if reserved is not None:
+            reserved.discard(seq)
+            if not reserved:
+                del self._reserved[device_id]
+
+    def in_use(self, device_id: str) -> int:
+        return len(self._reserved.get(device_id, ()))
+
+
+class CorrelationIndex(Generic[T]):
+    """Comandos en vuelo indexados por ``(device_id, secuencia)``: alta/baja/match O(1).
+
+    Con varios equipos detrás de un gateway la misma secuencia puede estar
+    viva en más de uno; la respuesta se resuelve por el par completo.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[CorrelationKey, T] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CorrelationKey) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[CorrelationKey]:
+        return iter(self._entries)
+
+    def items(self):
+        return self._entries.items()
+
+    def get(self, device_id: str, seq: int) -> Optional[T]:
+        return self._entries.get((device_id, seq))
+
+    def put(self, device_id: str, seq: int, value: T) -> Optional[T]:
+        """Registra ``value``; devuelve el que ocupaba la misma clave, si había."""
+        key = (device_id, seq)
+        stale = self._entries.get(key)
+        self._entries[key] = value
+        return stale
+
+    def pop(self, device_id: str, seq: int) -> Optional[T]:
+        return self._entries.pop((device_id, seq), None)
+
+
+__all__ = ["CorrelationIndex", "CorrelationKey", "SequenceAllocator", "SEQ_MAX", "SEQ_MIN"]
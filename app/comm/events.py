@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from PyQt6 import QtCore
+
+from .models import ResponseEnvelope
+
+EventCallback = Callable[[ResponseEnvelope], None]
+
+
+class Subscription:
+    """Suscripción a eventos ``EVT`` con cola propia acotada.
+
+    Si el consumidor no da abasto, la cola descarta los eventos más viejos y
+    los cuenta en ``dropped``; los demás suscriptores no se ven afectados.
+    """
+
+    def __init__(self, bus: "EventBus", pattern: str, callback: EventCallback, device: Optional[str], max_queue: int) -> None:
+        self.pattern = pattern
+        self.device = device
+        self.callback = callback
+        self.max_queue = max_queue
+        self.delivered = 0
+        self.dropped = 0
+        self._queue: Deque[ResponseEnvelope] = deque()
+        self._bus: Optional[EventBus] = bus
+
+    @property
+    def active(self) -> bool:
+        return self._bus is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def cancel(self) -> None:
+        if self._bus is not None:
+            self._bus.unsubscribe(self)
+
+    def _offer(self, event: ResponseEnvelope) -> None:
+        if len(self._queue) >= self.max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(event)
+
+    def _deliver(self, budget: int) -> None:
+        queue = self._queue
+        while queue and budget > 0 and self._bus is not None:
+            self.callback(queue.popleft())
+            self.delivered += 1
+            budget -= 1
+
+
+class _TrieNode:
+    __slots__ = ("children", "exact", "below")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.exact: Set[Subscription] = set()  # patrón que termina en este nodo
+        self.below: Set[Subscription] = set()  # "PREFIJO.*": todo lo que cuelga del nodo
+
+
+class EventBus(QtCore.QObject):
+    """Reparte ``EVT`` por nombre de evento y equipo a través de un trie por segmentos.
+
+    Patrones: ``"RF.PRESS"`` (exacto), ``"RF.*"`` (todo bajo ``RF``) y ``"*"``.
+    ``publish`` sólo encola en los suscriptores que coinciden; la entrega ocurre
+    en un timer que drena como máximo ``budget`` eventos por suscriptor y
+    vuelta, así un panel muy conversador no bloquea el hilo de la GUI.
+    """
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None, *, budget: int = 64) -> None:
+        super().__init__(parent)
+        self.budget = budget
+        self._roots: Dict[Optional[str], _TrieNode] = {}  # None: cualquier equipo
+        self._ready: Dict[Subscription, None] = {}  # suscriptores con eventos en cola, en orden
+        self.published = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._pump)
+
+    def subscribe(
+        self,
+        pattern: str,
+        callback: EventCallback,
+        *,
+        dev: Optional[str] = None,
+        max_queue: int = 256,
+    ) -> Subscription:
+        if max_queue <= 0:
+            raise ValueError("max_queue debe ser positivo")
+        sub = Subscription(self, pattern, callback, dev, max_queue)
+        node, wildcard = self._node_for(dev, pattern, create=True)
+        (node.below if wildcard else node.exact).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        if sub._bus is not self:
+            return
+        sub._bus = None
+        sub._queue.clear()
+        self._ready.pop(sub, None)
+        node, wildcard = self._node_for(sub.device, sub.pattern, create=False)
+        if node is not None:
+            (node.below if wildcard else node.exact).discard(sub)
+            root = self._roots[sub.device]
+            if not self._count(root):
+                del self._roots[sub.device]
+
+    def publish(self, event: ResponseEnvelope) -> int:
+        """Encola el evento en cada suscriptor que coincide; devuelve cuántos."""
+        self.published += 1
+        if not self._roots:
+            return 0  # sin suscriptores no hace falta separar los campos
+        fields = event.fields
+        if not fields:
+            return 0
+        segments = fields[0].split(".")
+        matched: List[Subscription] = []
+        for root in (self._roots.get(None), self._roots.get(event.device)):
+            if root is not None:
+                self._match(root, segments, matched)
+        for sub in matched:
+            sub._offer(event)
+            self._ready[sub] = None
+        if matched and not self._timer.isActive():
+            self._timer.start()
+        return len(matched)
+
+    def subscriptions(self) -> int:
+        return sum(self._count(root) for root in self._roots.values())
+
+    # ------------------------------------------------------------------
+    def _node_for(self, dev: Optional[str], pattern: str, *, create: bool):
+        segments = pattern.split(".")
+        wildcard = segments[-1] == "*"
+        if wildcard:
+            segments.pop()
+        node = self._roots.get(dev)
+        if node is None:
+            if not create:
+                return None, wildcard
+            node = self._roots[dev] = _TrieNode()
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                if not create:
+                    return None, wildcard
+                child = node.children[segment] = _TrieNode()
+            node = child
+        return node, wildcard
+
+    @staticmethod
+    def _match(node: _TrieNode, segments: List[str], out: List[Subscription]) -> None:
+        for segment in segments:
+            out.extend(node.below)
+            node = node.children.get(segment)
+            if node is None:
+                return
+        out.extend(node.exact)
+
+    def _count(self, node: _TrieNode) -> int:
+        return len(node.exact) + len(node.below) + sum(self._count(c) for c in node.children.values())
+
+    def _pump(self) -> None:
+        for sub in list(self._ready):
+            sub._deliver(self.budget)
+            if not sub._queue:
+                self._ready.pop(sub, None)
+        if not self._ready:
+            self._timer.stop()
+
+
+__all__ = ["EventBus", "Subscription"]
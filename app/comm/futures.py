@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import CancelledError, Future
+from typing import Any, Iterable, List, Optional
+
+from .models import PendingCommand, ResponseEnvelope
+
+
+class CommandError(Exception):
+    """El equipo respondió ``ERR`` al comando."""
+
+    def __init__(self, response: ResponseEnvelope) -> None:
+        detail = response.error_detail()
+        self.response = response
+        self.code: Optional[int] = detail[0] if detail else None
+        reason = detail[1] if detail else ""
+        if detail and not reason and len(response.fields) > 1:
+            reason = response.fields[1]  # ERR,<dev>,...,<code>,<motivo> llega en campos separados
+        self.reason: str = reason
+        super().__init__(f"ERR {self.code}: {self.reason}" if detail else f"ERR {list(response.fields)}")
+
+
+class CommandTimeout(TimeoutError):
+    """No llegó respuesta antes del timeout del comando."""
+
+    def __init__(self, command: PendingCommand) -> None:
+        self.command = command
+        super().__init__(f"Sin respuesta para {command.frame.spec.name} (seq {command.frame.header.sequence})")
+
+
+def gather(futures: Iterable["Future[Any]"], *, return_exceptions: bool = False) -> "Future[List[Any]]":
+    """Combina varios futures en uno que resuelve con la lista de resultados, en orden.
+
+    No bloquea: pensado para el hilo de la GUI, donde ``Future.result()`` sin
+    respuesta congelaría el event loop. Con ``return_exceptions`` las excepciones
+    se devuelven en la lista en lugar de propagar la primera.
+    """
+    items = list(futures)
+    combined: "Future[List[Any]]" = Future()
+    remaining = len(items)
+    if not items:
+        combined.set_result([])
+        return combined
+
+    def _done(_fut: "Future[Any]") -> None:
+        nonlocal remaining
+        remaining -= 1
+        if combined.done():
+            return
+        if not return_exceptions:
+            exc = None if _fut.cancelled() else _fut.exception()
+            if _fut.cancelled() or exc is not None:
+                combined.set_exception(exc or CancelledError())
+                return
+        if remaining == 0:
+            combined.set_result([_outcome(f) for f in items])
+
+    for fut in items:
+        fut.add_done_callback(_done)
+    return combined
+
+
+def _outcome(fut: "Future[Any]") -> Any:
+    if fut.cancelled():
+        return CancelledError()
+    exc = fut.exception()
+    return exc if exc is not None else fut.result()
+
+
+def as_awaitable(fut: "Future[Any]") -> "asyncio.Future[Any]":
+    """Adapta el future al event loop asyncio en curso (p.ej. qasync sobre Qt)."""
+    return asyncio.wrap_future(fut)
+
+
+async def gather_async(*futures: "Future[Any]", return_exceptions: bool = False) -> List[Any]:
+    """``await`` de varios comandos a la vez desde una corrutina."""
+    return await asyncio.gather(*(as_awaitable(f) for f in futures), return_exceptions=return_exceptions)
+
+
+__all__ = ["CommandError", "CommandTimeout", "gather", "gather_async", "as_awaitable"]
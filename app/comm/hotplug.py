@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from typing import Optional, Sequence
+
+from PyQt6 import QtCore
+
+# inotify(7)
+_IN_ATTRIB = 0x00000004
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_ATTRIB
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+SERIAL_NODE_PREFIXES = ("tty", "rfcomm")
+
+
+class HotplugWatcher(QtCore.QObject):
+    """Avisa cuando aparecen o desaparecen nodos seriales, sin polling.
+
+    En Linux vigila ``/dev`` (y ``/dev/serial/by-id`` si existe) con inotify;
+    el descriptor se integra al event loop con ``QSocketNotifier``, así que no
+    hay despertares mientras no cambie nada. Las ráfagas de eventos de udev
+    (create + chmod + symlinks) se agrupan en un único ``changed``.
+
+    ``active`` queda en False en otros sistemas o si inotify no está
+    disponible; quien lo usa debe caer al escaneo periódico. ``/sys/class/tty``
+    no se vigila: sysfs no emite eventos inotify al agregar dispositivos.
+    """
+
+    changed = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        parent: Optional[QtCore.QObject] = None,
+        *,
+        paths: Sequence[str] = ("/dev", "/dev/serial/by-id"),
+        debounce_ms: int = 50,
+    ) -> None:
+        super().__init__(parent)
+        self._fd = -1
+        self._notifier: Optional[QtCore.QSocketNotifier] = None
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self.changed)
+        if sys.platform.startswith("linux"):
+            self._start(paths)
+
+    @property
+    def active(self) -> bool:
+        return self._fd >= 0
+
+    def _start(self, paths: Sequence[str]) -> None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        watched = 0
+        for path in paths:
+            if os.path.isdir(path) and libc.inotify_add_watch(fd, os.fsencode(path), _WATCH_MASK) >= 0:
+                watched += 1
+        if not watched:
+            os.close(fd)
+            return
+        self._fd = fd
+        self._notifier = QtCore.QSocketNotifier(fd, QtCore.QSocketNotifier.Type.Read, self)
+        self._notifier.activated.connect(self._on_readable)
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._fd, 16 * 1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.close()
+            return
+        offset = 0
+        relevant = False
+        while offset + _EVENT.size <= len(data):
+            _wd, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if not name or name.startswith(SERIAL_NODE_PREFIXES) or name.startswith("usb-"):
+                relevant = True
+        if relevant:
+            self._debounce.start()
+
+    def close(self) -> None:
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._debounce.stop()
+
+
+__all__ = ["HotplugWatcher", "SERIAL_NODE_PREFIXES"]
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+from app.core import qc1_proto
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, **qc1_proto.DATACLASS_SLOTS)
 class FrameHeader:
     """Metadata que antecede cada comando QC1."""
 
@@ -25,6 +28,34 @@ class CommandField:
     default: Optional[str] = None
 
 
+# Prioridad de salida: menor sale primero cuando hay comandos esperando ventana.
+PRIORITY_INTERACTIVE = 0  # disparos/acciones del operador
+PRIORITY_BULK = 1  # configuración
+PRIORITY_POLL = 2  # consultas periódicas
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Reintentos ante timeout con backoff exponencial y jitter.
+
+    ``same_sequence`` reenvía el frame idéntico (misma secuencia) para que el
+    equipo descarte duplicados; las consultas de sólo lectura pueden usar una
+    secuencia nueva en cada intento.
+    """
+
+    max_retries: int = 2
+    base_delay_ms: int = 250
+    max_delay_ms: int = 4_000
+    multiplier: float = 2.0
+    jitter: float = 0.5  # fracción del delay que se aleatoriza hacia abajo
+    same_sequence: bool = True
+
+    def delay_ms(self, attempt: int, rand: float) -> int:
+        """Espera antes del reintento ``attempt`` (1..n); ``rand`` en [0, 1)."""
+        delay = min(self.base_delay_ms * self.multiplier ** (attempt - 1), self.max_delay_ms)
+        return max(1, int(delay * (1.0 - self.jitter * rand)))
+
+
 @dataclass(frozen=True)
 class CommandSpec:
     """Registro estandar de un comando soportado por el configurador."""
@@ -35,9 +66,17 @@ class CommandSpec:
     positional: Tuple[CommandField, ...] = ()
     keyword: Tuple[CommandField, ...] = ()
     requires_password: bool = False
+    timeout_ms: Optional[int] = None  # None: usa el timeout por defecto del servicio
+    priority: int = PRIORITY_BULK
+    coalesce: bool = False  # un envío en cola reemplaza al anterior aún no transmitido
+    retry: Optional[RetryPolicy] = None  # None: un timeout se reporta sin reintentar
+    cache_ttl_ms: Optional[int] = None  # consultas: vigencia de la respuesta en ResponseCache
+    invalidates: Tuple[str, ...] = ()  # consultas cuya respuesta cacheada queda obsoleta al aplicarse
+    stream: bool = False  # varias respuestas con la misma secuencia hasta el terminador END
+    stream_idle_ms: Optional[int] = None  # stream: sin frames nuevos en este plazo, lo recibido se da por completo
 
 
-@dataclass
+@dataclass(**qc1_proto.DATACLASS_SLOTS)
 class CommandFrame:
     """Comando listo para serializar y enviar."""
 
@@ -69,7 +108,7 @@ class CommandFrame:
             raise ValueError("Este comando requiere contraseña (PWD)")
 
 
-@dataclass
+@dataclass(**qc1_proto.DATACLASS_SLOTS)
 class PendingCommand:
     """Estado temporal de un comando en vuelo."""
 
@@ -77,24 +116,76 @@ class PendingCommand:
     raw_line: str
 
 
-@dataclass
 class ResponseEnvelope:
-    """Respuesta parseada proveniente del dispositivo."""
+    """Respuesta parseada proveniente del dispositivo.
 
-    raw_line: str
-    prefix: str
-    device: str
-    sequence: int
-    timestamp: int
-    fields: Sequence[str]
+    Construida con ``from_response`` conserva la respuesta del protocolo y el
+    frame crudo: ``fields``, ``as_dict()`` y ``raw_line`` se materializan al
+    primer acceso y quedan cacheados. Los EVT que sólo se enrutan por
+    prefijo/equipo/secuencia no pagan el split ni la decodificación.
+    """
+
+    __slots__ = ("prefix", "device", "sequence", "timestamp", "_raw", "_fields", "_source", "_dict")
+
+    def __init__(
+        self,
+        raw_line: str,
+        prefix: str,
+        device: str,
+        sequence: int,
+        timestamp: int,
+        fields: Sequence[str] = (),
+    ) -> None:
+        self.prefix = prefix
+        self.device = device
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self._raw: Union[str, bytes] = raw_line
+        self._fields: Optional[Sequence[str]] = fields
+        self._source: Any = None
+        self._dict: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def from_response(cls, resp: Any, raw: Union[str, bytes]) -> "ResponseEnvelope":
+        """Envuelve un ``QC1Response`` sin copiar sus campos."""
+        env = cls(raw_line="", prefix=resp.prefix, device=resp.dev, sequence=resp.seq, timestamp=resp.ts)
+        env._raw = raw
+        env._fields = None
+        env._source = resp
+        return env
+
+    @property
+    def raw_line(self) -> str:
+        if not isinstance(self._raw, str):
+            self._raw = self._raw.decode("ascii", errors="ignore").rstrip("\r\n")
+        return self._raw
+
+    @raw_line.setter
+    def raw_line(self, value: str) -> None:
+        self._raw = value
+
+    @property
+    def fields(self) -> Sequence[str]:
+        if self._fields is None:
+            self._fields = self._source.fields
+            self._source = None
+        return self._fields
+
+    @fields.setter
+    def fields(self, value: Sequence[str]) -> None:
+        self._fields = value
+        self._source = None
+        self._dict = None
 
     def as_dict(self) -> Dict[str, str]:
-        data: Dict[str, str] = {}
-        for item in self.fields:
-            if "=" in item:
-                k, v = item.split("=", 1)
-                data[k] = v
-        return data
+        if self._dict is None:
+            data: Dict[str, str] = {}
+            for item in self.fields:
+                if "=" in item:
+                    k, v = item.split("=", 1)
+                    data[k] = v
+            self._dict = data
+        return dict(self._dict)
 
     def is_ok(self) -> bool:
         return self.prefix.upper() == "OK"
@@ -115,6 +206,120 @@ class ResponseEnvelope:
         except ValueError:
             return None
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ResponseEnvelope):
+            return NotImplemented
+        return (self.raw_line, self.prefix, self.device, self.sequence, self.timestamp, list(self.fields)) == \
+            (other.raw_line, other.prefix, other.device, other.sequence, other.timestamp, list(other.fields))
+
+    def __repr__(self) -> str:
+        return (
+            f"ResponseEnvelope(raw_line={self.raw_line!r}, prefix={self.prefix!r}, device={self.device!r}, "
+            f"sequence={self.sequence!r}, timestamp={self.timestamp!r}, fields={self.fields!r})"
+        )
+
+
+# Capacidad de los typecodes de ResponseBatch
+_U16_MAX = 0xFFFF
+_U32_MAX = 0xFFFFFFFF
+_I64_MIN = -(1 << 63)
+_I64_MAX = (1 << 63) - 1
+
+
+class ResponseBatch:
+    """Resultado columnar de ``codec.decode_many``/``decode_buffer``.
+
+    Una fila por frame válido; nada se materializa como objeto por línea:
+
+    - ``prefix_codes``/``device_codes``: índices a las tablas ``prefixes``/``devices``
+      (``array('H')``/``array('I')``)
+    - ``seq`` (``array('H')``), ``ts`` (``array('q')``, int64)
+    - ``field_start``/``field_end``: rango del texto de campos dentro de ``buffer``
+    - ``line_index``: posición del frame en la entrada original
+    - ``errors``: posiciones de las líneas descartadas (checksum/formato)
+    """
+
+    __slots__ = (
+        "buffer", "prefixes", "devices", "prefix_codes", "device_codes", "seq", "ts",
+        "field_start", "field_end", "line_index", "errors", "_prefix_ids", "_device_ids",
+    )
+
+    def __init__(self, buffer: bytes = b"") -> None:
+        self.buffer = buffer
+        self.prefixes: List[str] = []
+        self.devices: List[str] = []
+        self.prefix_codes = array("H")
+        self.device_codes = array("I")
+        self.seq = array("H")
+        self.ts = array("q")
+        self.field_start = array("Q")
+        self.field_end = array("Q")
+        self.line_index = array("Q")
+        self.errors = array("Q")
+        self._prefix_ids: Dict[str, int] = {}
+        self._device_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    def append(self, line: int, prefix: str, device: str, sequence: int, timestamp: int,
+               start: int, end: int) -> None:
+        """Agrega una fila; valida todo antes de tocar columnas (ValueError si no entra)."""
+        if not 0 <= sequence <= _U16_MAX:
+            raise ValueError(f"seq fuera de rango: {sequence}")
+        if not _I64_MIN <= timestamp <= _I64_MAX:
+            raise ValueError(f"ts fuera de rango int64: {timestamp}")
+        code = self._prefix_ids.get(prefix)
+        if code is None and len(self.prefixes) > _U16_MAX:
+            raise ValueError("demasiados prefijos distintos en el lote")
+        dev = self._device_ids.get(device)
+        if dev is None and len(self.devices) > _U32_MAX:
+            raise ValueError("demasiados equipos distintos en el lote")
+        if code is None:
+            code = self._prefix_ids[prefix] = len(self.prefixes)
+            self.prefixes.append(prefix)
+        if dev is None:
+            dev = self._device_ids[device] = len(self.devices)
+            self.devices.append(device)
+        self.prefix_codes.append(code)
+        self.device_codes.append(dev)
+        self.seq.append(sequence)
+        self.ts.append(timestamp)
+        self.field_start.append(start)
+        self.field_end.append(end)
+        self.line_index.append(line)
+
+    def prefix_code(self, prefix: str) -> Optional[int]:
+        return self._prefix_ids.get(prefix)
+
+    def device_code(self, device: str) -> Optional[int]:
+        return self._device_ids.get(device)
+
+    def fields(self, row: int) -> List[str]:
+        raw = self.buffer[self.field_start[row]:self.field_end[row]]
+        return qc1_proto.csv_split_q(raw.decode("ascii"))
+
+    def envelope(self, row: int) -> "ResponseEnvelope":
+        """Materializa una fila como ResponseEnvelope (para inspección puntual)."""
+        return ResponseEnvelope(
+            raw_line="",
+            prefix=self.prefixes[self.prefix_codes[row]],
+            device=self.devices[self.device_codes[row]],
+            sequence=self.seq[row],
+            timestamp=self.ts[row],
+            fields=self.fields(row),
+        )
+
+    def as_numpy(self) -> Dict[str, Any]:
+        """Columnas como arrays NumPy sin copia (requiere numpy instalado)."""
+        import numpy as np
+
+        return {
+            name: np.frombuffer(getattr(self, name), dtype=getattr(self, name).typecode)
+            for name in ("prefix_codes", "device_codes", "seq", "ts", "field_start",
+                         "field_end", "line_index", "errors")
+        }
+
 
 __all__ = [
     "FrameHeader",
@@ -123,4 +328,5 @@ __all__ = [
     "CommandFrame",
     "PendingCommand",
     "ResponseEnvelope",
+    "ResponseBatch",
 ]
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from PyQt6 import QtCore
+from PyQt6.QtSerialPort import QSerialPortInfo
+
+from .futures import gather
+from .hotplug import HotplugWatcher
+from .models import PendingCommand, ResponseEnvelope
+from .serial_manager import SerialManager
+from .service import PasswordProvider, SerialCommandService
+from .timers import DeadlineScheduler
+
+
+class _Meter:
+    """Bytes por segundo sobre una ventana deslizante de baldes de 1 s."""
+
+    __slots__ = ("window_s", "total", "_buckets", "_clock")
+
+    def __init__(self, window_s: int, clock: Callable[[], float]) -> None:
+        self.window_s = window_s
+        self.total = 0
+        self._buckets: Deque[List[int]] = deque()  # [segundo, bytes]
+        self._clock = clock
+
+    def add(self, count: int) -> None:
+        self.total += count
+        now = int(self._clock())
+        if self._buckets and self._buckets[-1][0] == now:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([now, count])
+            self._trim(now)
+
+    def rate(self) -> float:
+        now = int(self._clock())
+        self._trim(now)
+        return sum(count for _second, count in self._buckets) / self.window_s
+
+    def _trim(self, now: int) -> None:
+        while self._buckets and self._buckets[0][0] <= now - self.window_s:
+            self._buckets.popleft()
+
+
+class _Member(QtCore.QObject):
+    """Estado de un puerto del pool; sus slots corren en el hilo de la GUI.
+
+    ``data_sent`` se emite desde el hilo de I/O: al conectarlo a métodos de un
+    QObject del hilo principal Qt lo encola en vez de llamarlo allí.
+    """
+
+    def __init__(self, pool: "SerialPool", port: str, manager: SerialManager, service: SerialCommandService) -> None:
+        super().__init__(pool)
+        self.pool = pool
+        self.port = port
+        self.manager = manager
+        self.service = service
+        self.tx = _Meter(pool._stats_window_s, pool._clock)
+        self.rx = _Meter(pool._stats_window_s, pool._clock)
+        self.responses = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.opened_at = pool._clock()  # se reinicia en cada apertura
+        manager.data_sent.connect(self._on_sent)
+        manager.data_received.connect(self._on_received)
+        manager.connection_changed.connect(self._on_connection_changed)
+        manager.error_occurred.connect(self._on_error)
+        manager.backpressure.connect(self._on_backpressure)
+        service.response_received.connect(self._on_response)
+        service.command_timed_out.connect(self._on_timed_out)
+
+    def _on_sent(self, data: bytes, _port: str) -> None:
+        self.tx.add(len(data))
+
+    def _on_received(self, data: bytes, _port: str) -> None:
+        self.rx.add(len(data))
+
+    def _on_connection_changed(self, connected: bool, _port: str) -> None:
+        if connected:
+            self.opened_at = self.pool._clock()
+        self.pool._update_scanning()
+        self.pool.connection_changed.emit(self.port, connected)
+
+    def _on_error(self, message: str, _port: str) -> None:
+        self.errors += 1
+        self.pool.error_occurred.emit(self.port, message)
+
+    def _on_backpressure(self, active: bool) -> None:
+        self.pool.backpressure.emit(self.port, active)
+
+    def _on_response(self, response: ResponseEnvelope) -> None:
+        self.responses += 1
+        self.pool.response_received.emit(self.port, response)
+
+    def _on_timed_out(self, command: PendingCommand) -> None:
+        self.timeouts += 1
+        self.pool.command_timed_out.emit(self.port, command)
+
+
+class SerialPool(QtCore.QObject):
+    """Varios equipos QC1 a la vez, uno por puerto (p. ej. un banco con hub USB).
+
+    Cada puerto tiene su ``SerialManager`` (con su propio hilo de I/O) y su
+    ``SerialCommandService`` (con su ventana y su cola), así un equipo lento
+    sólo demora lo suyo. Los timeouts de todos comparten un ``DeadlineScheduler``
+    y el hotplug es uno solo para todo el pool: enumera una vez por cambio y
+    reabre los puertos perdidos que reaparecen.
+
+    Las señales del pool agregan las de cada puerto y llevan el puerto como
+    primer argumento; ``stats()`` da el throughput por puerto.
+    """
+
+    response_received = QtCore.pyqtSignal(str, ResponseEnvelope)   # puerto, respuesta
+    command_timed_out = QtCore.pyqtSignal(str, PendingCommand)     # puerto, comando
+    connection_changed = QtCore.pyqtSignal(str, bool)              # puerto, estado
+    error_occurred = QtCore.pyqtSignal(str, str)                   # puerto, mensaje
+    backpressure = QtCore.pyqtSignal(str, bool)                    # puerto, activo
+    port_added = QtCore.pyqtSignal(str)
+    port_removed = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self,
+        parent: Optional[QtCore.QObject] = None,
+        *,
+        model: str,
+        password_provider: Optional[PasswordProvider] = None,
+        timeout_ms: int = 60_000,
+        window_size: Optional[int] = 8,
+        max_ports: int = 16,
+        scheduler: Optional[DeadlineScheduler] = None,
+        baud_cache: Optional[Dict[str, int]] = None,
+        scan_interval_ms: int = 2000,
+        stats_window_s: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(parent)
+        if max_ports <= 0:
+            raise ValueError("max_ports debe ser positivo")
+        self._model = model
+        self._password_provider = password_provider
+        self._timeout_ms = timeout_ms
+        self._window_size = window_size
+        self.max_ports = max_ports
+        self._scheduler = scheduler or DeadlineScheduler(parent=self)
+        self.baud_cache: Dict[str, int] = baud_cache if baud_cache is not None else {}
+        self._stats_window_s = stats_window_s
+        self._clock = clock
+        self._members: Dict[str, _Member] = {}
+
+        self._hotplug = HotplugWatcher(self)
+        self._hotplug.changed.connect(self._scan_ports)
+        self._scan_timer = QtCore.QTimer(self)
+        self._scan_timer.setInterval(scan_interval_ms)
+        self._scan_timer.timeout.connect(self._scan_ports)
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    # ------------------------------------------------------------------
+    @property
+    def scheduler(self) -> DeadlineScheduler:
+        return self._scheduler
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, port: object) -> bool:
+        return port in self._members
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._members))
+
+    def ports(self) -> List[str]:
+        return list(self._members)
+
+    def service(self, port: str) -> SerialCommandService:
+        return self._members[port].service
+
+    def manager(self, port: str) -> SerialManager:
+        return self._members[port].manager
+
+    def add(
+        self,
+        port: str,
+        device_id: str,
+        *,
+        model: Optional[str] = None,
+        settings: Optional[Dict[str, Any]] = None,
+        autobaud: bool = False,
+    ) -> SerialCommandService:
+        """Abre ``port`` para el equipo ``device_id`` y devuelve su servicio.
+
+        Si el puerto no abre queda igual en el pool y se reintenta cuando el
+        hotplug lo vea reaparecer. Con ``autobaud`` detecta la velocidad
+        (ver ``SerialManager.set_autobaud``) usando ``baud_cache`` del pool;
+        la detección no bloquea y cada puerto la hace en paralelo con los demás.
+        """
+        if port in self._members:
+            raise ValueError(f"{port} ya está en el pool")
+        if len(self._members) >= self.max_ports:
+            raise RuntimeError(f"El pool admite como máximo {self.max_ports} puertos")
+        model = model or self._model
+        manager = SerialManager(baud_cache=self.baud_cache, watch_ports=False)
+        manager.setParent(self)
+        if autobaud:
+            manager.set_autobaud(model, device_id)
+        service = SerialCommandService(
+            manager,
+            model=model,
+            device_id=device_id,
+            password_provider=self._password_provider,
+            timeout_ms=self._timeout_ms,
+            scheduler=self._scheduler,
+            window_size=self._window_size,
+        )
+        service.setParent(self)
+        self._members[port] = _Member(self, port, manager, service)
+
+        self.port_added.emit(port)
+        if not manager.open_port(port, settings):
+            self._update_scanning()  # try_reconnect lo reabre al reaparecer
+        return service
+
+    def remove(self, port: str) -> None:
+        """Cierra el puerto y cancela sus comandos pendientes."""
+        member = self._members.pop(port, None)
+        if member is None:
+            return
+        member.service.cancel_all()
+        member.manager.shutdown()
+        member.service.deleteLater()
+        member.manager.deleteLater()
+        member.deleteLater()
+        self._update_scanning()
+        self.port_removed.emit(port)
+
+    def send_all(
+        self,
+        command_name: str,
+        positional: Optional[Iterable[str]] = None,
+        keyword: Optional[dict] = None,
+    ) -> "Future[List[Any]]":
+        """Envía el mismo comando a cada puerto conectado.
+
+        Devuelve ``gather`` de sus futures, en el orden de ``ports()``; un
+        equipo que falla aparece como excepción en su lugar.
+        """
+        positional = list(positional or ())
+        futures = [
+            member.service.send_async(command_name, positional, keyword)
+            for member in self._members.values()
+            if member.manager.is_connected()
+        ]
+        return gather(futures, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Throughput y estado por puerto (``*_bps`` promedian los últimos ``stats_window_s`` s)."""
+        now = self._clock()
+        result: Dict[str, Dict[str, float]] = {}
+        for port, member in self._members.items():
+            service = member.service
+            result[port] = {
+                "connected": member.manager.is_connected(),
+                "tx_bytes": member.tx.total,
+                "rx_bytes": member.rx.total,
+                "tx_bps": member.tx.rate(),
+                "rx_bps": member.rx.rate(),
+                "responses": member.responses,
+                "timeouts": member.timeouts,
+                "errors": member.errors,
+                "in_flight": service.in_flight,
+                "backlog": service.backlog_size,
+                "tx_outstanding": member.manager.tx_outstanding,
+                "retry_rate": service.retry_metrics()["rate"],
+                "uptime_s": now - member.opened_at if member.manager.is_connected() else 0.0,
+            }
+        return result
+
+    def shutdown(self) -> None:
+        self._scan_timer.stop()
+        self._hotplug.close()
+        for port in list(self._members):
+            self.remove(port)
+
+    # ------------------------------------------------------------------
+    def _update_scanning(self) -> None:
+        """Escaneo periódico sólo si hay puertos caídos y no hay hotplug."""
+        lost = any(not m.manager.is_connected() for m in self._members.values())
+        if lost and not self._hotplug.active:
+            if not self._scan_timer.isActive():
+                self._scan_timer.start()
+        else:
+            self._scan_timer.stop()
+
+    def _scan_ports(self) -> None:
+        # Los que todavía detectan baudios ya están en curso: no se reabren
+        lost = [m for m in self._members.values() if not m.manager.is_connected() and not m.manager.opening]
+        if not lost:
+            return
+        available = [info.portName() for info in QSerialPortInfo.availablePorts()]
+        for member in lost:
+            member.manager.try_reconnect(available)
+
+
+__all__ = ["SerialPool"]
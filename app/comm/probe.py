@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+from PyQt6 import QtCore
+from PyQt6.QtSerialPort import QSerialPort
+
+from app.core import qc1_proto
+
+
+class _Probe:
+    __slots__ = ("port", "rates", "index", "serial", "reader", "timer")
+
+    def __init__(self, port: str, rates: Sequence[int], serial: QSerialPort, timer: QtCore.QTimer) -> None:
+        self.port = port
+        self.rates = list(rates)
+        self.index = 0
+        self.serial = serial
+        self.reader = qc1_proto.QC1FrameReader()
+        self.timer = timer
+
+    @property
+    def baud(self) -> int:
+        return self.rates[self.index]
+
+
+class PortProber(QtCore.QObject):
+    """Confirma en paralelo qué puerto (y a qué velocidad) tiene un equipo QC1.
+
+    Abre todos los candidatos a la vez y escribe el mismo frame de sondeo
+    (normalmente ``SYS.INFO?``); gana la primera respuesta ``OK``/``ERR`` con
+    checksum válido y los demás puertos se cierran en ese momento. Con una
+    lista de velocidades por puerto, cada puerto las prueba en orden (un
+    puerto sólo puede estar a una velocidad a la vez) y ``timeout_ms`` es el
+    plazo de cada intento. Todo corre en el event loop, sin bloquear.
+    """
+
+    # (puerto ganador o "" si nadie respondió, baudios, respuesta del equipo o None)
+    finished = QtCore.pyqtSignal(str, int, object)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None, *, timeout_ms: int = 800) -> None:
+        super().__init__(parent)
+        self._timeout_ms = timeout_ms
+        self._frame = b""
+        self._probes: Dict[str, _Probe] = {}
+
+    def set_timeout(self, timeout_ms: int) -> None:
+        self._timeout_ms = timeout_ms
+
+    @property
+    def running(self) -> bool:
+        return bool(self._probes)
+
+    def start(
+        self,
+        ports: Union[Sequence[str], Mapping[str, Sequence[int]]],
+        frame: bytes,
+        settings: Dict[str, Any],
+    ) -> int:
+        """Lanza el sondeo; devuelve cuántos puertos pudieron abrirse.
+
+        ``ports`` es una lista de nombres (a ``settings['baud_rate']``) o un
+        mapa nombre -> velocidades a probar en orden.
+        """
+        self.cancel()
+        self._frame = frame
+        if not isinstance(ports, Mapping):
+            ports = {port: (settings['baud_rate'],) for port in ports}
+        for port, rates in ports.items():
+            if not rates:
+                continue
+            serial = QSerialPort(self)
+            serial.setPortName(port)
+            serial.setBaudRate(rates[0])
+            serial.setDataBits(settings['data_bits'])
+            serial.setParity(settings['parity'])
+            serial.setStopBits(settings['stop_bits'])
+            serial.setFlowControl(settings['flow_control'])
+            if not serial.open(QtCore.QIODevice.OpenModeFlag.ReadWrite):
+                serial.deleteLater()
+                continue
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            probe = _Probe(port, rates, serial, timer)
+            self._probes[port] = probe
+            serial.readyRead.connect(lambda p=probe: self._on_ready_read(p))
+            timer.timeout.connect(lambda p=probe: self._on_attempt_timeout(p))
+            self._attempt(probe)
+        if not self._probes:
+            QtCore.QTimer.singleShot(0, lambda: self.finished.emit("", 0, None))
+        return len(self._probes)
+
+    def cancel(self) -> None:
+        for probe in self._probes.values():
+            self._close(probe)
+        self._probes.clear()
+
+    def _attempt(self, probe: _Probe) -> None:
+        probe.serial.write(self._frame)
+        probe.timer.start(self._timeout_ms)
+
+    def _on_attempt_timeout(self, probe: _Probe) -> None:
+        if self._probes.get(probe.port) is not probe:
+            return
+        probe.index += 1
+        if probe.index < len(probe.rates):
+            # Siguiente velocidad sobre el mismo puerto abierto; descarta lo recibido
+            probe.serial.setBaudRate(probe.baud)
+            probe.serial.clear(QSerialPort.Direction.AllDirections)
+            probe.reader.reset()
+            self._attempt(probe)
+            return
+        self._close(self._probes.pop(probe.port))
+        if not self._probes:
+            self.finished.emit("", 0, None)
+
+    def _on_ready_read(self, probe: _Probe) -> None:
+        if self._probes.get(probe.port) is not probe:
+            return
+        for line in probe.reader.feed(bytes(probe.serial.readAll())):
+            try:
+                response = qc1_proto.parse_response_bytes(line)
+            except (qc1_proto.QC1ParseError, ValueError):
+                continue  # basura: otra velocidad u otro protocolo
+            if response.prefix in ("OK", "ERR"):
+                baud = probe.baud
+                self.cancel()
+                self.finished.emit(probe.port, baud, response)
+                return
+
+    @staticmethod
+    def _close(probe: _Probe) -> None:
+        probe.timer.stop()
+        probe.timer.deleteLater()
+        serial = probe.serial
+        try:
+            serial.readyRead.disconnect()
+        except Exception:
+            pass
+        if serial.isOpen():
+            serial.close()
+        serial.deleteLater()
+
+
+__all__ = ["PortProber"]
@@ -2,7 +2,12 @@ from __future__ import annotations
 
 from typing import Dict
 
-from .models import CommandField, CommandSpec
+from .models import PRIORITY_INTERACTIVE, PRIORITY_POLL, CommandField, CommandSpec, RetryPolicy
+
+# Consultas sin efectos: se reintentan con secuencia nueva.
+READONLY_RETRY = RetryPolicy(max_retries=3, same_sequence=False)
+# Comandos que modifican estado: mismo frame y secuencia para que el equipo deduplique.
+MUTATING_RETRY = RetryPolicy(max_retries=2, same_sequence=True)
 
 
 COMMANDS: Dict[str, CommandSpec] = {
@@ -14,6 +19,10 @@ COMMANDS: Dict[str, CommandSpec] = {
         positional=(),
         keyword=(),
         requires_password=False,
+        timeout_ms=5_000,
+        priority=PRIORITY_POLL,
+        retry=READONLY_RETRY,
+        cache_ttl_ms=10_000,
     ),
     "SYS.REBOOT": CommandSpec(
         name="SYS.REBOOT",
@@ -24,6 +33,8 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("DELAY", "Segundos antes de reiniciar", required=False, default="5"),
         ),
         requires_password=True,
+        timeout_ms=15_000,
+        invalidates=("SYS.INFO?",),
     ),
     "SEC.PWD.SET": CommandSpec(
         name="SEC.PWD.SET",
@@ -35,6 +46,7 @@ COMMANDS: Dict[str, CommandSpec] = {
         ),
         keyword=(),
         requires_password=False,
+        retry=MUTATING_RETRY,
     ),
     # --- Contactos -----------------------------------------------------------
     "CONTACT.AUTH.SET": CommandSpec(
@@ -46,6 +58,8 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("LIST", "Números E164 separados por ';'"),
         ),
         requires_password=True,
+        retry=MUTATING_RETRY,
+        invalidates=("CONTACT.AUTH.GET?",),
     ),
     "CONTACT.AUTH.GET?": CommandSpec(
         name="CONTACT.AUTH.GET?",
@@ -54,6 +68,9 @@ COMMANDS: Dict[str, CommandSpec] = {
         positional=(),
         keyword=(),
         requires_password=False,
+        priority=PRIORITY_POLL,
+        retry=READONLY_RETRY,
+        cache_ttl_ms=60_000,
     ),
     "CONTACT.GROUP.SET": CommandSpec(
         name="CONTACT.GROUP.SET",
@@ -68,6 +85,7 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("MEMBERS", "Lista CSV de números o IDs"),
         ),
         requires_password=True,
+        retry=MUTATING_RETRY,
     ),
     "CONTACT.GROUP.BULK": CommandSpec(
         name="CONTACT.GROUP.BULK",
@@ -78,6 +96,7 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("LIST", "Lista JSON de grupos"),
         ),
         requires_password=True,
+        retry=MUTATING_RETRY,
     ),
     "CONTACT.GROUP.TEST": CommandSpec(
         name="CONTACT.GROUP.TEST",
@@ -90,6 +109,8 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("TEMPLATE", "Nombre de plantilla a usar", required=False, default="prueba"),
         ),
         requires_password=True,
+        timeout_ms=30_000,
+        priority=PRIORITY_INTERACTIVE,
     ),
     # --- Automatización ------------------------------------------------------
     "IO.INPUT.MAP": CommandSpec(
@@ -101,6 +122,7 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("MAP", "JSON con definición de entradas"),
         ),
         requires_password=True,
+        retry=MUTATING_RETRY,
     ),
     "IO.OUTPUT.MAP": CommandSpec(
         name="IO.OUTPUT.MAP",
@@ -111,6 +133,8 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("MAP", "JSON con definición de salidas"),
         ),
         requires_password=True,
+        coalesce=True,
+        retry=MUTATING_RETRY,
     ),
     "IO.SCHEDULE.SET": CommandSpec(
         name="IO.SCHEDULE.SET",
@@ -121,6 +145,7 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("LIST", "JSON con arreglo de horarios"),
         ),
         requires_password=True,
+        retry=MUTATING_RETRY,
     ),
     "IO.OUTPUT.TRIGGER": CommandSpec(
         name="IO.OUTPUT.TRIGGER",
@@ -133,6 +158,8 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("ACTION", "ACCION: ACTIVAR|LIBERAR"),
         ),
         requires_password=True,
+        priority=PRIORITY_INTERACTIVE,
+        retry=MUTATING_RETRY,
     ),
     # --- Audio ----------------------------------------------------------------
     "AUDIO.SLOTS?": CommandSpec(
@@ -142,6 +169,9 @@ COMMANDS: Dict[str, CommandSpec] = {
         positional=(),
         keyword=(),
         requires_password=False,
+        priority=PRIORITY_POLL,
+        retry=READONLY_RETRY,
+        cache_ttl_ms=60_000,
     ),
     "AUDIO.PLAY": CommandSpec(
         name="AUDIO.PLAY",
@@ -156,6 +186,9 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("LOOP", "1 para repetir", required=False),
         ),
         requires_password=True,
+        priority=PRIORITY_INTERACTIVE,
+        retry=MUTATING_RETRY,
+        invalidates=("AUDIO.SLOTS?",),
     ),
     "AUDIO.UPLOAD": CommandSpec(
         name="AUDIO.UPLOAD",
@@ -171,6 +204,8 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("ENC", "1 si se debe cifrar", required=False),
         ),
         requires_password=True,
+        timeout_ms=120_000,
+        invalidates=("AUDIO.SLOTS?",),
     ),
     # --- Servidor -------------------------------------------------------------
     "SRV.MQTT.SET": CommandSpec(
@@ -188,6 +223,7 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("TLS", "0/1 para TLS", required=False, default="0"),
         ),
         requires_password=True,
+        retry=MUTATING_RETRY,
     ),
     "SRV.MQTT.TEST": CommandSpec(
         name="SRV.MQTT.TEST",
@@ -196,6 +232,8 @@ COMMANDS: Dict[str, CommandSpec] = {
         positional=(),
         keyword=(),
         requires_password=False,
+        timeout_ms=30_000,
+        priority=PRIORITY_INTERACTIVE,
     ),
     # --- Notificaciones ------------------------------------------------------
     "NTF.CHANNEL.SET": CommandSpec(
@@ -211,6 +249,8 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("VOICE", "0/1", required=False, default="0"),
         ),
         requires_password=True,
+        coalesce=True,
+        retry=MUTATING_RETRY,
     ),
     "NTF.TEMPLATE.SET": CommandSpec(
         name="NTF.TEMPLATE.SET",
@@ -223,6 +263,7 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("BODY", "Contenido con placeholders"),
         ),
         requires_password=True,
+        retry=MUTATING_RETRY,
     ),
     # --- Logs ----------------------------------------------------------------
     "LOGS.PULL?": CommandSpec(
@@ -234,6 +275,11 @@ COMMANDS: Dict[str, CommandSpec] = {
             CommandField("LINES", "Máximo de líneas", required=False, default="100"),
         ),
         requires_password=False,
+        timeout_ms=120_000,
+        priority=PRIORITY_POLL,
+        retry=READONLY_RETRY,
+        stream=True,
+        stream_idle_ms=2_000,  # firmware sin END responde un único OK
     ),
 }
 
@@ -245,4 +291,4 @@ def get_command(name: str) -> CommandSpec:
         raise KeyError(f"Comando no registrado: {name}") from exc
 
 
-__all__ = ["COMMANDS", "get_command"]
+__all__ = ["COMMANDS", "MUTATING_RETRY", "READONLY_RETRY", "get_command"]
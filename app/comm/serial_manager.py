@@ -1,9 +1,180 @@
 ﻿from __future__ import annotations
 
-from typing import Optional, Dict, Any, List
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal, QIODevice
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Deque, Sequence
+from PyQt6.QtCore import QCoreApplication, QObject, QThread, QTimer, Qt, pyqtSignal, pyqtSlot, QIODevice
 from PyQt6.QtSerialPort import QSerialPort, QSerialPortInfo
 
+from app.core import qc1_proto
+
+from .hotplug import HotplugWatcher
+from .probe import PortProber
+
+
+class SerialWorker(QObject):
+    """
+    Dueno del QSerialPort; vive en el hilo de I/O de SerialManager.
+    - TX: SerialManager deja los bytes en `tx_queue` (deque, append/popleft
+      atomicos) y avisa una sola vez; el worker los pasa al QSerialPort sin
+      bloquear, de a lo sumo `driver_window` bytes pendientes en el driver, y
+      sigue con cada `bytesWritten` (las escrituras parciales se completan).
+    - RX: lo leido se acumula en `rx_queue` y se avisa una sola vez hasta que
+      el hilo de la GUI lo drena, asi varias lecturas llegan en un solo lote.
+    """
+
+    rx_ready = pyqtSignal()
+    data_written = pyqtSignal(bytes, str)            # datos, puerto
+    tx_progress = pyqtSignal(int)                    # bytes aceptados por el driver
+    error_message = pyqtSignal(str, str)             # mensaje, puerto
+    port_error = pyqtSignal(object)                  # QSerialPort.SerialPortError
+
+    def __init__(self, driver_window: int = 4096) -> None:
+        super().__init__()
+        self.serial: Optional[QSerialPort] = None
+        self.driver_window = driver_window
+        self._out: Deque[memoryview] = deque()     # pendiente de entregar al QSerialPort
+        self._out_chunks: Deque[bytes] = deque()   # chunks originales, para data_written
+        self.port_name: str = ""
+        self.config: Dict[str, Any] = {}
+        self.tx_queue: Deque[bytes] = deque()
+        self.rx_queue: Deque[bytes] = deque()
+        self.tx_signaled = False
+        self.rx_signaled = False
+        self.result = False  # resultado de la ultima llamada bloqueante (open/close)
+
+    @pyqtSlot(str, object)
+    def open(self, port_name: str, config: Dict[str, Any]) -> None:
+        if self.serial is None:
+            self.serial = QSerialPort(self)
+            self.serial.readyRead.connect(self._on_ready_read)
+            self.serial.errorOccurred.connect(self._on_error)
+            self.serial.bytesWritten.connect(self._on_bytes_written)
+
+        self.serial.setPortName(port_name)
+        self.port_name = port_name
+        self.config = config
+        self.serial.setBaudRate(config['baud_rate'])
+        self.serial.setDataBits(config['data_bits'])
+        self.serial.setParity(config['parity'])
+        self.serial.setStopBits(config['stop_bits'])
+        self.serial.setFlowControl(config['flow_control'])
+
+        self.result = self.serial.open(QIODevice.OpenModeFlag.ReadWrite)
+        if not self.result:
+            try:
+                self.serial.close()
+            except Exception:
+                pass
+
+    @pyqtSlot()
+    def close(self) -> None:
+        was_open = False
+        self.tx_queue.clear()
+        self._out.clear()
+        self._out_chunks.clear()
+        if self.serial:
+            try:
+                # Evita callbacks durante cierre
+                try:
+                    self.serial.readyRead.disconnect(self._on_ready_read)
+                except Exception:
+                    pass
+                try:
+                    self.serial.errorOccurred.disconnect(self._on_error)
+                except Exception:
+                    pass
+                try:
+                    self.serial.bytesWritten.disconnect(self._on_bytes_written)
+                except Exception:
+                    pass
+
+                if self.serial.isOpen():
+                    try:
+                        self.serial.setDataTerminalReady(False)
+                    except Exception:
+                        pass
+                    try:
+                        self.serial.setRequestToSend(False)
+                    except Exception:
+                        pass
+                    try:
+                        self.serial.flush()
+                    except Exception:
+                        pass
+                    # Limpia buffers RX/TX (segÃºn disponibilidad de firma)
+                    try:
+                        self.serial.clear(QSerialPort.Direction.AllDirections)
+                    except Exception:
+                        try:
+                            self.serial.clear()
+                        except Exception:
+                            pass
+                    try:
+                        self.serial.waitForBytesWritten(150)
+                    except Exception:
+                        pass
+
+                    self.serial.close()
+                    was_open = True
+            finally:
+                try:
+                    self.serial.deleteLater()
+                except Exception:
+                    pass
+                self.serial = None
+                self.port_name = ""
+        self.result = was_open
+
+    @pyqtSlot()
+    def flush_tx(self) -> None:
+        self.tx_signaled = False
+        while self.tx_queue:
+            chunk = self.tx_queue.popleft()
+            self._out.append(memoryview(chunk))
+            self._out_chunks.append(chunk)
+        self._drain()
+
+    def _drain(self) -> None:
+        """Entrega al QSerialPort lo que entra en la ventana del driver, sin esperar."""
+        serial = self.serial
+        if not serial or not serial.isOpen():
+            return
+        room = self.driver_window - serial.bytesToWrite()
+        while self._out and room > 0:
+            view = self._out[0]
+            n = serial.write(view[:room].tobytes())
+            if n == -1:
+                self.error_message.emit("Error al escribir datos", self.port_name)
+                self._out.popleft()
+                self._out_chunks.popleft()
+                self.tx_progress.emit(len(view))  # descartado: deja de contar como pendiente
+                continue
+            room -= n
+            if n < len(view):
+                self._out[0] = view[n:]  # escritura parcial: el resto sale con el proximo bytesWritten
+                if n == 0:
+                    break
+                continue
+            self._out.popleft()
+            self.data_written.emit(self._out_chunks.popleft(), self.port_name)
+
+    def _on_bytes_written(self, count: int) -> None:
+        self.tx_progress.emit(count)
+        self._drain()
+
+    def _on_ready_read(self) -> None:
+        if self.serial and self.serial.isOpen():
+            data = bytes(self.serial.readAll())
+            if data:
+                self.rx_queue.append(data)
+                if not self.rx_signaled:
+                    self.rx_signaled = True
+                    self.rx_ready.emit()
+
+    def _on_error(self, error) -> None:
+        self.port_error.emit(error)
+
 
 class SerialManager(QObject):
     """
@@ -19,6 +190,8 @@ class SerialManager(QObject):
     data_sent = pyqtSignal(bytes, str)               # datos, puerto
     error_occurred = pyqtSignal(str, str)            # mensaje, puerto
     connection_changed = pyqtSignal(bool, str)       # estado, puerto
+    backpressure = pyqtSignal(bool)                  # True: TX por encima de la marca alta
+    baud_detected = pyqtSignal(str, int)             # puerto, baudios (nuevo valor en baud_cache)
     ports_updated = pyqtSignal(list)                 # lista de puertos
 
     # ConfiguraciÃ³n por defecto
@@ -43,17 +216,85 @@ class SerialManager(QObject):
         QSerialPort.SerialPortError.NotOpenError: "Puerto no abierto",
     }
 
-    def __init__(self, scan_interval_ms: int = 2000):
+    def __init__(
+        self,
+        scan_interval_ms: int = 2000,
+        tx_high_watermark: int = 64 * 1024,
+        tx_low_watermark: int = 16 * 1024,
+        baud_rates: Sequence[int] = (115200, 230400, 38400, 9600),
+        baud_cache: Optional[Dict[str, int]] = None,
+        watch_ports: bool = True,
+    ):
         super().__init__()
-        self.serial: Optional[QSerialPort] = None
         self.port_name: str = ""
         self._last_ports: List[str] = []
         self._scan_interval_ms = scan_interval_ms
+        # False: sin hotplug ni escaneo propios; quien lo crea (p. ej. SerialPool)
+        # enumera y llama a try_reconnect
+        self._watch_ports = watch_ports
         self._shutting_down = False
-
+        self._connected = False
+        # Bytes de TX aun no aceptados por el driver (cola del worker + buffer de Qt)
+        self._tx_outstanding = 0
+        self._tx_high = 0
+        self._tx_low = 0
+        self._backpressured = False
+        self.set_tx_watermarks(tx_high_watermark, tx_low_watermark)
+
+        # I/O del puerto en un hilo propio: write y readAll no bloquean la GUI. open/close esperan al worker (BlockingQueued).
+        self._io_thread = QThread(self)
+        self._io_thread.setObjectName("SerialManagerIO")
+        self._worker = SerialWorker()
+        self._worker.moveToThread(self._io_thread)
+        self._open_requested.connect(self._worker.open, Qt.ConnectionType.BlockingQueuedConnection)
+        self._close_requested.connect(self._worker.close, Qt.ConnectionType.BlockingQueuedConnection)
+        self._tx_requested.connect(self._worker.flush_tx, Qt.ConnectionType.QueuedConnection)
+        self._worker.rx_ready.connect(self._handle_ready_read, Qt.ConnectionType.QueuedConnection)
+        self._worker.data_written.connect(self.data_sent)
+        self._worker.tx_progress.connect(self._on_tx_progress, Qt.ConnectionType.QueuedConnection)
+        self._worker.error_message.connect(self.error_occurred)
+        self._worker.port_error.connect(self._handle_error, Qt.ConnectionType.QueuedConnection)
+        self._io_thread.finished.connect(self._worker.deleteLater)
+        self._io_thread.start()
+        app = QCoreApplication.instance()
+        if app is not None:
+            # El hilo debe detenerse antes de que Qt destruya el QThread
+            app.aboutToQuit.connect(self.shutdown)
+
+        # Autodeteccion de baudios: velocidades a probar y la ganadora por
+        # numero de serie (o nombre de puerto), compartible con Settings
+        self.baud_rates = list(baud_rates)
+        self.baud_cache: Dict[str, int] = baud_cache if baud_cache is not None else {}
+        self._probe_identity: Optional[tuple] = None
+        self._baud_probe_ms = 300
+
+        # Puerto a recuperar tras una desconexion inesperada (ResourceError)
+        self._reconnect_port = ""
+
+        # Hotplug por inotify en Linux; el escaneo periodico queda como respaldo
+        self._scanning = False
+        self._hotplug: Optional[HotplugWatcher] = None
+        if watch_ports:
+            self._hotplug = HotplugWatcher(self)
+            self._hotplug.changed.connect(self._on_hotplug)
+        self._prober = PortProber(self)
+        self._prober.finished.connect(self._on_probe_finished)
+        # Deteccion de baudios de open_port: (puerto, ajustes, clave de baud_cache)
+        self._baud_prober = PortProber(self)
+        self._baud_prober.finished.connect(self._on_baud_probed)
+        self._detecting: Optional[tuple] = None
+        self._probe_settings: Optional[Dict[str, Any]] = None
+        self._probe_keys: Dict[str, str] = {}
         self._scan_timer = QTimer(self)
         self._scan_timer.timeout.connect(self._scan_ports)
-        self._scan_timer.start(self._scan_interval_ms)
+        self._start_scanning()
+        if self._hotplug is not None and self._hotplug.active:
+            QTimer.singleShot(0, self._scan_ports)
+
+    # Peticiones al worker (hilo de I/O)
+    _open_requested = pyqtSignal(str, object)
+    _close_requested = pyqtSignal()
+    _tx_requested = pyqtSignal()
 
     # QObjects y __del__ no son confiables, pero lo dejamos de red de seguridad
     def __del__(self):
@@ -64,12 +305,28 @@ class SerialManager(QObject):
 
     # --- ESCANEO DE PUERTOS ---
 
+    def _start_scanning(self):
+        if not self._watch_ports:
+            return
+        self._scanning = True
+        if not self._hotplug.active:
+            self._scan_timer.start(self._scan_interval_ms)
+
+    def _stop_scanning(self):
+        self._scanning = False
+        self._scan_timer.stop()
+
+    def _on_hotplug(self):
+        if self._scanning and not self._shutting_down:
+            self._scan_ports()
+
     def _scan_ports(self):
         ports = self.get_list_ports()
         if ports != self._last_ports:
             self._last_ports = ports
             self.ports_updated.emit(ports)
-        self._try_reconnect()
+        if not self.opening:
+            self.try_reconnect(ports)
 
     def get_list_ports(self) -> list:
         """Devuelve los nombres de los puertos disponibles."""
@@ -79,151 +336,216 @@ class SerialManager(QObject):
         """Devuelve informaciÃ³n detallada de un puerto."""
         for port in QSerialPortInfo.availablePorts():
             if port.portName() == port_name:
-                return {
-                    'description': port.description(),
-                    'manufacturer': port.manufacturer(),
-                    'serial_number': port.serialNumber(),
-                    'vendor_id': port.vendorIdentifier(),
-                    'product_id': port.productIdentifier(),
-                    'system_location': port.systemLocation()
-                }
+                return self._describe(port)
         return {}
 
+    def _port_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Una sola enumeracion: nombre -> descriptor (mismo formato que get_port_info)."""
+        return {port.portName(): self._describe(port) for port in QSerialPortInfo.availablePorts()}
+
+    @staticmethod
+    def _describe(port: QSerialPortInfo) -> Dict[str, Any]:
+        return {
+            'description': port.description(),
+            'manufacturer': port.manufacturer(),
+            'serial_number': port.serialNumber(),
+            'vendor_id': port.vendorIdentifier(),
+            'product_id': port.productIdentifier(),
+            'system_location': port.systemLocation()
+        }
+
     # --- CONEXIÃ“N ---
 
     def open_port(self, port_name: str, settings: Optional[Dict[str, Any]] = None) -> bool:
-        """Abre un puerto con los ajustes dados o por defecto. Devuelve True/False."""
-        if self.serial is None:
-            self.serial = QSerialPort()
-            self.serial.readyRead.connect(self._handle_ready_read)
-            self.serial.errorOccurred.connect(self._handle_error)
-        elif self.serial.isOpen():
+        """Abre un puerto con los ajustes dados o por defecto. Devuelve True/False.
+
+        Con set_autobaud activo y sin 'baud_rate' en `settings`, primero detecta
+        la velocidad sin bloquear: devuelve True (deteccion en curso, ver
+        `opening`) y el resultado llega por connection_changed / error_occurred.
+        """
+        if self._detecting and self._detecting[0] == port_name:
+            return True
+        if self._connected or self._detecting:
             self.close_port()
 
-        self.serial.setPortName(port_name)
         self.port_name = port_name
-        config = {**self.DEFAULT_SETTINGS, **(settings or {})}
-
-        self.serial.setBaudRate(config['baud_rate'])
-        self.serial.setDataBits(config['data_bits'])
-        self.serial.setParity(config['parity'])
-        self.serial.setStopBits(config['stop_bits'])
-        self.serial.setFlowControl(config['flow_control'])
+        if self._probe_identity and 'baud_rate' not in (settings or {}):
+            self._start_detection(port_name, settings or {})
+            return True
+        return self._open_now(port_name, settings)
 
-        ok = self.serial.open(QIODevice.OpenModeFlag.ReadWrite)
+    def _open_now(self, port_name: str, settings: Optional[Dict[str, Any]]) -> bool:
+        config = {**self.DEFAULT_SETTINGS, **(settings or {})}
+        self._open_requested.emit(port_name, config)
+        ok = self._worker.result
         if ok:
+            self._connected = True
+            self._reconnect_port = ""
             self.connection_changed.emit(True, port_name)
-            self._scan_timer.stop()
+            self._stop_scanning()
             return True
         else:
             self.error_occurred.emit(f"Error al abrir {port_name}", port_name)
-            try:
-                self.serial.close()
-            except Exception:
-                pass
             return False
 
+    # --- AUTODETECCION DE BAUDIOS ---
+
+    def set_autobaud(self, model: Optional[str], device_id: Optional[str] = None, probe_timeout_ms: int = 300):
+        """Activa (o con `model=None` desactiva) la deteccion de baudios en open_port.
+
+        Cada velocidad se confirma con SYS.INFO? y checksum QC1 valido; la
+        ganadora queda en `baud_cache` y las cacheadas se prueban primero.
+        """
+        self._probe_identity = (model, device_id) if model and device_id else None
+        self._baud_probe_ms = probe_timeout_ms
+
+    def _baud_key(self, port_name: str, info: Optional[Dict[str, Any]] = None) -> str:
+        info = info if info is not None else self.get_port_info(port_name)
+        serial_number = (info.get('serial_number') or '').strip()
+        return f"sn:{serial_number}" if serial_number else port_name
+
+    def _rates_for(self, key: str) -> List[int]:
+        cached = self.baud_cache.get(key)
+        rates = [r for r in self.baud_rates if r != cached]
+        return [cached] + rates if cached else rates
+
+    def _remember_baud(self, key: str, port_name: str, baud: int) -> None:
+        if self.baud_cache.get(key) != baud:
+            self.baud_cache[key] = baud
+            self.baud_detected.emit(port_name, baud)
+
+    def _probe_frame(self) -> bytes:
+        model, device_id = self._probe_identity
+        return qc1_proto.build_command(model, device_id, 1, int(time.time()), "SYS.INFO?").encode("ascii")
+
+    @property
+    def opening(self) -> bool:
+        """True mientras un sondeo (auto_connect o deteccion de baudios) tiene puertos tomados."""
+        return self._detecting is not None or self._prober.running
+
+    def _start_detection(self, port_name: str, settings: Dict[str, Any]) -> None:
+        """Prueba las velocidades en orden (cacheada primero) y termina en _on_baud_probed."""
+        key = self._baud_key(port_name)
+        self._detecting = (port_name, settings, key)
+        config = {**self.DEFAULT_SETTINGS, **settings}  # paridad/bits del llamador; baud_rate lo fija el prober
+        self._baud_prober.set_timeout(self._baud_probe_ms)
+        self._baud_prober.start({port_name: self._rates_for(key)}, self._probe_frame(), config)
+
+    def _on_baud_probed(self, port: str, baud: int, _response) -> None:
+        if self._detecting is None:
+            return
+        port_name, settings, key = self._detecting
+        self._detecting = None
+        if port:
+            self._remember_baud(key, port_name, baud)
+        else:
+            # Nadie respondio: se abre igual a la velocidad cacheada o por defecto
+            baud = self.baud_cache.get(key) or settings.get('baud_rate') or self.DEFAULT_SETTINGS['baud_rate']
+        self._open_now(port_name, {**settings, 'baud_rate': baud})
+
     def close_port(self, _restart_scan: bool = True):
         """Cierra el puerto si estÃ¡ abierto y limpia correctamente."""
-        if self.serial:
-            try:
-                # Evita callbacks durante cierre
-                try:
-                    self.serial.readyRead.disconnect(self._handle_ready_read)
-                except Exception:
-                    pass
-                try:
-                    self.serial.errorOccurred.disconnect(self._handle_error)
-                except Exception:
-                    pass
-
-                if self.serial.isOpen():
-                    try:
-                        self.serial.setDataTerminalReady(False)
-                    except Exception:
-                        pass
-                    try:
-                        self.serial.setRequestToSend(False)
-                    except Exception:
-                        pass
-                    try:
-                        self.serial.flush()
-                    except Exception:
-                        pass
-                    # Limpia buffers RX/TX (segÃºn disponibilidad de firma)
-                    try:
-                        self.serial.clear(QSerialPort.Direction.AllDirections)
-                    except Exception:
-                        try:
-                            self.serial.clear()
-                        except Exception:
-                            pass
-                    try:
-                        self.serial.waitForBytesWritten(150)
-                    except Exception:
-                        pass
-
-                    port_name = self.port_name
-                    self.serial.close()
-                    self.connection_changed.emit(False, port_name)
-            finally:
-                try:
-                    self.serial.deleteLater()
-                except Exception:
-                    pass
-                self.serial = None
-                self.port_name = ""
+        if self._detecting is not None:
+            self._detecting = None
+            self._baud_prober.cancel()
+        if self._io_thread.isRunning():
+            self._close_requested.emit()
+            was_open = self._worker.result
+        else:
+            was_open = False
+        port_name = self.port_name
+        self._connected = False
+        self.port_name = ""
+        self._tx_outstanding = 0
+        self._update_backpressure()
+        if was_open:
+            self.connection_changed.emit(False, port_name)
 
         if _restart_scan and not self._shutting_down:
-            self._scan_timer.start(self._scan_interval_ms)
+            self._start_scanning()
 
     def restart_connection(self):
         """Reabre el puerto actual, si existe."""
         if self.port_name:
             self.open_port(self.port_name)
 
-    def auto_connect(self):
-        """Se conecta automÃ¡ticamente al primer puerto 'vÃ¡lido' y se detiene."""
-        ports = self.get_list_ports()
-        if not ports:
+    def auto_connect(
+        self,
+        model: Optional[str] = None,
+        device_id: Optional[str] = None,
+        settings: Optional[Dict[str, Any]] = None,
+        timeout_ms: int = 800,
+    ):
+        """Se conecta automÃ¡ticamente al primer puerto 'vÃ¡lido' y se detiene.
+
+        Con `model` y `device_id`, sondea todos los candidatos en paralelo con
+        SYS.INFO? y se queda con el primero que responde (resultado asincrono
+        via connection_changed / error_occurred). Sin ellos, abre el primero.
+        Con set_autobaud activo, cada puerto prueba ademas sus velocidades
+        (la cacheada primero) y la ganadora queda en baud_cache.
+        """
+        snapshot = self._port_snapshot()
+        if not snapshot:
             self.error_occurred.emit("No hay puertos disponibles", "")
             return
-        
+
         blacklist = ("INTEL", "BLUETOOTH")
         prefer = ("USB", "CH340", "CP210", "FTDI", "SILABS", "PROLIFIC")
 
+        def desc(port: str) -> str:
+            return (snapshot[port].get('description') or '').upper()
+
         # 1) prioriza los que parezcan USB-Serial, 2) el resto
-        ordered = sorted(
-            ports,
-            key=lambda p: (
-                0 if any(k in (self.get_port_info(p).get('description') or '').upper() for k in prefer) else 1
-            )
-        )
-
-        for port in ordered:
+        ordered = sorted(snapshot, key=lambda p: 0 if any(k in desc(p) for k in prefer) else 1)
+        candidates = [p for p in ordered if not any(b in desc(p) for b in blacklist)]
+
+        if not (model and device_id) and self._probe_identity:
+            model, device_id = self._probe_identity
+        if model and device_id:
+            config = {**self.DEFAULT_SETTINGS, **(settings or {})}
+            frame = qc1_proto.build_command(model, device_id, 1, int(time.time()), "SYS.INFO?")
+            self._probe_settings = settings
+            self._probe_keys = {p: self._baud_key(p, snapshot[p]) for p in candidates}
+            if self._probe_identity and 'baud_rate' not in (settings or {}):
+                # Puertos en paralelo, velocidades en secuencia dentro de cada puerto
+                targets = {p: self._rates_for(self._probe_keys[p]) for p in candidates}
+                self._prober.set_timeout(self._baud_probe_ms)
+            else:
+                targets = {p: [config['baud_rate']] for p in candidates}
+                self._prober.set_timeout(timeout_ms)
+            if self._connected or self._detecting:
+                self.close_port(_restart_scan=False)
+            self._prober.start(targets, frame.encode("ascii"), config)
+            return
+
+        for port in candidates:
             try:
-                info = self.get_port_info(port)
-                desc = (info.get('description') or '').upper()
-                if any(b in desc for b in blacklist):
-                    continue
-                if self.open_port(port):
+                if self.open_port(port, settings):
                     return
             except Exception as e:
                 self.error_occurred.emit(f"Error analizando {port}: {e}", port)
         self.error_occurred.emit("No se pudo abrir ningÃºn puerto", "")
 
+    def _on_probe_finished(self, port: str, baud: int, _response) -> None:
+        if port:
+            if self._probe_identity:
+                self._remember_baud(self._probe_keys.get(port, port), port, baud)
+            if self.open_port(port, {**(self._probe_settings or {}), 'baud_rate': baud}):
+                return
+        self.error_occurred.emit("Ningun puerto respondio al sondeo QC1", port)
 
-
-    def _try_reconnect(self):
+    def try_reconnect(self, available: Optional[List[str]] = None):
         """Reconecta automÃ¡ticamente si el puerto reaparece."""
-        if not self.is_connected() and self.port_name:
-            available = self.get_list_ports()
-            if self.port_name in available:
-                self.open_port(self.port_name)
+        port = self.port_name or self._reconnect_port
+        if not self.is_connected() and not self.opening and port:
+            if available is None:
+                available = self.get_list_ports()
+            if port in available:
+                self.open_port(port)
 
     # --- ESTADO ---
     def is_connected(self) -> bool:
-        return self.serial is not None and self.serial.isOpen()
+        return self._connected
 
     def get_port_name(self) -> str:
         return self.port_name or ""
@@ -231,32 +553,60 @@ class SerialManager(QObject):
     def get_current_settings(self) -> Dict[str, Any]:
         if not self.is_connected():
             return {}
+        config = self._worker.config
         return {
-            'baud_rate': self.serial.baudRate(),
-            'data_bits': self.serial.dataBits(),
-            'parity': self.serial.parity(),
-            'stop_bits': self.serial.stopBits(),
-            'flow_control': self.serial.flowControl()
+            'baud_rate': config['baud_rate'],
+            'data_bits': config['data_bits'],
+            'parity': config['parity'],
+            'stop_bits': config['stop_bits'],
+            'flow_control': config['flow_control']
         }
 
     # --- ENVÃO ---
 
     def send_data_bytes(self, data: bytes) -> None:
         """EnvÃ­a datos en bytes (sin modificar)."""
-        if not self.serial or not self.serial.isOpen():
-            return
-        n = self.serial.write(data)
-        if n == -1:
-            self.error_occurred.emit("Error al escribir datos", self.port_name)
+        if not self._connected:
             return
-        try:
-            self.serial.waitForBytesWritten(100)  # asegurar salida
-        except Exception:
-            pass
-        if n == len(data):
-            self.data_sent.emit(data, self.port_name)
-        else:
-            self.error_occurred.emit(f"Datos enviados parcialmente ({n}/{len(data)})", self.port_name)
+        worker = self._worker
+        data = bytes(data)
+        worker.tx_queue.append(data)
+        self._tx_outstanding += len(data)
+        if not worker.tx_signaled:
+            worker.tx_signaled = True
+            self._tx_requested.emit()
+        self._update_backpressure()
+
+    # --- CONTROL DE FLUJO TX ---
+
+    def set_tx_watermarks(self, high: int, low: int) -> None:
+        """Marcas para `backpressure`: se activa al llegar a `high` y se libera al bajar a `low`."""
+        if not 0 <= low < high:
+            raise ValueError("Se requiere 0 <= low < high")
+        self._tx_high = high
+        self._tx_low = low
+        self._update_backpressure()
+
+    @property
+    def tx_outstanding(self) -> int:
+        """Bytes encolados que el driver todavia no acepto."""
+        return self._tx_outstanding
+
+    @property
+    def backpressured(self) -> bool:
+        return self._backpressured
+
+    def _on_tx_progress(self, count: int) -> None:
+        self._tx_outstanding = max(0, self._tx_outstanding - count)
+        self._update_backpressure()
+
+    def _update_backpressure(self) -> None:
+        if not self._backpressured and self._tx_outstanding >= self._tx_high:
+            self._backpressured = True
+            self.backpressure.emit(True)
+        elif self._backpressured and self._tx_outstanding <= self._tx_low:
+            self._backpressured = False
+            self.backpressure.emit(False)
 
     def send_data_str(self, data: str) -> None:
         """EnvÃ­a datos como string (con `\\n` si falta)."""
@@ -267,10 +617,13 @@ class SerialManager(QObject):
     # --- RECEPCIÃ“N ---
 
     def _handle_ready_read(self):
-        if self.serial and self.serial.isOpen():
-            data = bytes(self.serial.readAll())
-            if data:
-                self.data_received.emit(data, self.port_name)
+        worker = self._worker
+        worker.rx_signaled = False  # antes de drenar: una lectura posterior vuelve a avisar
+        chunks: List[bytes] = []
+        while worker.rx_queue:
+            chunks.append(worker.rx_queue.popleft())
+        if chunks:
+            self.data_received.emit(b"".join(chunks), self.port_name)
 
     # --- ERRORES ---
 
@@ -283,6 +636,7 @@ class SerialManager(QObject):
 
         if error in (QSerialPort.SerialPortError.ResourceError,
                      QSerialPort.SerialPortError.DeviceNotFoundError):
+            self._reconnect_port = self.port_name or self._reconnect_port
             self.close_port()
 
     # --- APAGADO GLOBAL ---
@@ -291,7 +645,12 @@ class SerialManager(QObject):
         """Cierra y destruye recursos sin reactivar el escaneo."""
         self._shutting_down = True
         try:
-            self._scan_timer.stop()
+            self._stop_scanning()
+            if self._hotplug is not None:
+                self._hotplug.close()
         except Exception:
             pass
         self.close_port(_restart_scan=False)
+        if self._io_thread.isRunning():
+            self._io_thread.quit()
+            self._io_thread.wait()
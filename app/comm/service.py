@@ -1,25 +1,47 @@
 from __future__ import annotations
 
+import random
 import time
-from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, Optional
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from dataclasses import dataclass, field, replace
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
 from PyQt6 import QtCore
 
 from app.core import qc1_proto
 
 from . import codec, registry
-from .models import CommandFrame, CommandSpec, FrameHeader, PendingCommand, ResponseEnvelope
+from .batch import BatchResult, CommandBatch
+from .cache import ResponseCache, cache_key
+from .correlation import CorrelationIndex, SequenceAllocator
+from .events import EventBus, EventCallback, Subscription
+from .futures import CommandError, CommandTimeout
+from .models import (
+    PRIORITY_POLL,
+    CommandFrame,
+    CommandSpec,
+    FrameHeader,
+    PendingCommand,
+    ResponseEnvelope,
+)
 from .serial_manager import SerialManager
+from .stream import ResponseStream
+from .timers import DeadlineScheduler
 
 PasswordProvider = Callable[[CommandSpec], Optional[str]]
 TimestampProvider = Callable[[], int]
 
+_PACKET_PREFIX = (qc1_proto.QC1_SIGNATURE + ",").encode("ascii")
 
-@dataclass
+
+@dataclass(eq=False)  # identidad como clave en el DeadlineScheduler
 class _PendingEntry:
     command: PendingCommand
-    timer: QtCore.QTimer
+    data: bytes
+    waiters: List["Future[Optional[ResponseEnvelope]]"] = field(default_factory=list)
+    attempt: int = 0  # reintentos ya realizados
+    stream: Optional[ResponseStream] = None  # comandos CommandSpec.stream
 
 
 class SerialCommandService(QtCore.QObject):
@@ -32,6 +54,9 @@ class SerialCommandService(QtCore.QObject):
     parse_failed = QtCore.pyqtSignal(str)
     transport_error = QtCore.pyqtSignal(str, str)
     command_timed_out = QtCore.pyqtSignal(PendingCommand)
+    window_full = QtCore.pyqtSignal(bool)
+    command_coalesced = QtCore.pyqtSignal(PendingCommand, PendingCommand)  # (descartado, vigente)
+    command_retried = QtCore.pyqtSignal(PendingCommand, int)  # (comando, intento)
 
     def __init__(
         self,
@@ -42,6 +67,10 @@ class SerialCommandService(QtCore.QObject):
         password_provider: Optional[PasswordProvider] = None,
         timestamp_provider: Optional[TimestampProvider] = None,
         timeout_ms: int = 60_000,
+        scheduler: Optional[DeadlineScheduler] = None,
+        window_size: Optional[int] = 8,
+        rng: Optional[random.Random] = None,
+        cache: Optional[ResponseCache] = None,
     ) -> None:
         super().__init__()
         self._serial = serial
@@ -50,17 +79,48 @@ class SerialCommandService(QtCore.QObject):
         self._password_provider = password_provider or (lambda _spec: None)
         self._timestamp_provider = timestamp_provider or (lambda: int(time.time()))
         self._timeout_ms = timeout_ms
-        self._sequence = 0
-        self._rx_buffer = ""
-        self._pending: Dict[int, _PendingEntry] = {}
+        self._sequences = SequenceAllocator()
+        self._encoders: Dict[str, codec.CommandEncoder] = {device_id: codec.CommandEncoder(model, device_id)}
+        self._reader = qc1_proto.QC1FrameReader()
+        # En vuelo por (device_id, secuencia): en un bus compartido la misma
+        # secuencia puede estar viva en varios equipos.
+        self._pending: CorrelationIndex[_PendingEntry] = CorrelationIndex()
+        # Ventana deslizante: como máximo `window_size` comandos en vuelo (None = sin límite);
+        # el resto espera en una cola por prioridad (FIFO dentro de cada una) y sale a
+        # medida que llegan respuestas o vencen.
+        self._window_size = window_size
+        self._backlog: List[Deque[_PendingEntry]] = [deque() for _ in range(PRIORITY_POLL + 1)]
+        self._queued = 0
+        # Comandos `coalesce` en cola, por nombre: un envío nuevo reemplaza al anterior
+        self._coalescing: Dict[Tuple[str, str], _PendingEntry] = {}
+        self._coalesced = 0
+        self._bytes_saved = 0
+        self._window_was_full = False
+        # Un solo timer periódico para todos los timeouts (compartible entre servicios)
+        self._scheduler = scheduler or DeadlineScheduler(parent=self)
+        # Reintentos según CommandSpec.retry; el jitter sale de `rng`
+        self._rng = rng or random.Random()
+        self._sent = 0
+        self._retries = 0
+        self._recovered = 0
+        self._exhausted = 0
+        # Respuestas de consultas con CommandSpec.cache_ttl_ms (sólo las consulta send_async)
+        self._cache = cache if cache is not None else ResponseCache()
+        # EVT no solicitados, filtrados por nombre/equipo (además de response_received)
+        self._events = EventBus(parent=self)
 
         self._serial.data_received.connect(self._on_serial_data)
         self._serial.error_occurred.connect(self.transport_error)
+        self._serial.connection_changed.connect(self._on_connection_changed)
 
     # ------------------------------------------------------------------
-    def next_sequence(self) -> int:
-        self._sequence = (self._sequence + 1) % 10_000
-        return self._sequence
+    def next_sequence(self, device_id: Optional[str] = None) -> int:
+        """Próxima secuencia libre (1..9999) del equipo, sin reservarla.
+
+        Sirve para armar un frame a mano; la reserva ocurre recién al pasarlo a
+        ``send(sequence=...)``/``send_frame``, y se libera al completarse.
+        """
+        return self._sequences.peek(device_id or self._device_id)
 
     def send(
         self,
@@ -71,103 +131,514 @@ class SerialCommandService(QtCore.QObject):
         password: Optional[str] = None,
         timestamp: Optional[int] = None,
         sequence: Optional[int] = None,
+        device_id: Optional[str] = None,
     ) -> PendingCommand:
+        self._reject_stream(registry.get_command(command_name))
+        frame = self._build_frame(command_name, positional, keyword, password, timestamp, sequence, device_id)
+        return self._enqueue(frame).command
+
+    def send_frame(self, frame: CommandFrame) -> PendingCommand:
+        """Codifica y envía el frame, o lo encola si la ventana está llena.
+
+        La secuencia del frame se reserva como cualquier otra: ``ValueError`` si
+        ya hay un comando vivo con el mismo ``(device_id, secuencia)``.
+        """
+        self._reject_stream(frame.spec)
+        self._sequences.reserve(frame.header.device_id, frame.header.sequence)
+        return self._enqueue(frame).command
+
+    def send_async(
+        self,
+        command_name: str,
+        positional: Optional[Iterable[str]] = None,
+        keyword: Optional[dict] = None,
+        *,
+        password: Optional[str] = None,
+        timestamp: Optional[int] = None,
+        sequence: Optional[int] = None,
+        device_id: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> "Future[Optional[ResponseEnvelope]]":
+        """Como ``send`` pero devuelve un future con la respuesta correlacionada.
+
+        El future resuelve con el ``ResponseEnvelope`` (``None`` si el equipo sólo
+        devolvió el eco del comando) o falla con ``CommandError`` ante ``ERR`` y
+        ``CommandTimeout`` si vence el plazo. Desde asyncio (event loop integrado
+        con Qt) usar ``futures.as_awaitable``/``gather_async``; en el hilo de la
+        GUI nunca bloquear con ``result()``.
+
+        Las consultas con ``cache_ttl_ms`` resuelven de inmediato desde la caché
+        mientras la respuesta siga vigente (``use_cache=False`` fuerza el envío).
+        """
+        spec = registry.get_command(command_name)
+        self._reject_stream(spec)
+        future: "Future[Optional[ResponseEnvelope]]" = Future()
+        if use_cache and spec.cache_ttl_ms:
+            cached = self._cache.get(cache_key(device_id or self._device_id, command_name, positional or (), keyword))
+            if cached is not None:
+                future.set_result(cached)
+                return future
+        frame = self._build_frame(command_name, positional, keyword, password, timestamp, sequence, device_id)
+        self._enqueue(frame, future)
+        return future
+
+    def send_stream(
+        self,
+        command_name: str,
+        positional: Optional[Iterable[str]] = None,
+        keyword: Optional[dict] = None,
+        *,
+        password: Optional[str] = None,
+        timestamp: Optional[int] = None,
+        sequence: Optional[int] = None,
+        device_id: Optional[str] = None,
+        max_buffer: int = 1024,
+    ) -> ResponseStream:
+        """Envía un comando ``stream`` y devuelve sus respuestas parciales a medida que llegan.
+
+        El comando sigue en vuelo hasta el terminador ``END`` (o un ``ERR``); cada
+        frame parcial reinicia su timeout. Con ``stream_idle_ms`` en la spec, un
+        silencio de ese plazo tras algún frame también lo cierra (firmware que
+        responde un único ``OK`` sin ``END``). ``send``/``send_async``/``batch``
+        rechazan estos comandos.
+        """
+        frame = self._build_frame(command_name, positional, keyword, password, timestamp, sequence, device_id)
+        if not frame.spec.stream:
+            self._sequences.release(frame.header.device_id, frame.header.sequence)
+            raise ValueError(f"{command_name} no es un comando stream")
+        return self._enqueue(frame, max_buffer=max_buffer).stream
+
+    @staticmethod
+    def _reject_stream(spec: CommandSpec) -> None:
+        # Sus respuestas parciales sólo son accesibles a través de ResponseStream
+        if spec.stream:
+            raise ValueError(f"{spec.name} es un comando stream: usar send_stream")
+
+    def batch(self) -> CommandBatch:
+        """Lote de comandos que sale en una sola escritura (ver ``CommandBatch``)."""
+        return CommandBatch(self)
+
+    def _submit_batch(self, items: List[tuple]) -> BatchResult:
+        if not self._serial.is_connected():
+            raise RuntimeError("El puerto serial no está conectado")
+        for item in items:
+            self._reject_stream(registry.get_command(item[0]))
+        entries: List[_PendingEntry] = []
+        futures: List["Future[Optional[ResponseEnvelope]]"] = []
+        try:
+            for item in items:
+                frame = self._build_frame(*item)
+                future: "Future[Optional[ResponseEnvelope]]" = Future()
+                entries.append(self._make_entry(frame, future))
+                futures.append(future)
+        except Exception:
+            # Todo o nada: un ítem inválido descarta el lote sin dejar secuencias tomadas
+            for entry in entries:
+                self._release(entry)
+                self._settle(entry, error=CancelledError())
+            raise
+        ready: List[_PendingEntry] = []
+        for entry in entries:
+            if self._queued or self._window_is_full(len(ready)):
+                self._push_backlog(entry)
+            else:
+                ready.append(entry)
+        written = self._transmit_many(ready)
+        return BatchResult([entry.command for entry in entries], futures, written)
+
+    def _build_frame(
+        self,
+        command_name: str,
+        positional: Optional[Iterable[str]],
+        keyword: Optional[dict],
+        password: Optional[str],
+        timestamp: Optional[int],
+        sequence: Optional[int],
+        device_id: Optional[str] = None,
+    ) -> CommandFrame:
         spec = registry.get_command(command_name)
 
         pwd = password if password is not None else self._password_provider(spec)
+        positional = list(positional or [])
+        keyword = dict(keyword or {})
+        if timestamp is None:
+            timestamp = self._timestamp_provider()
 
+        # La secuencia se toma al final: lo que falle antes no deja reservas
+        device_id = device_id or self._device_id
+        if sequence is None:
+            sequence = self._sequences.allocate(device_id)
+        else:
+            self._sequences.reserve(device_id, sequence)
         header = FrameHeader(
             model=self._model,
-            device_id=self._device_id,
-            sequence=sequence if sequence is not None else self.next_sequence(),
-            timestamp=timestamp if timestamp is not None else self._timestamp_provider(),
+            device_id=device_id,
+            sequence=sequence,
+            timestamp=timestamp,
             password=pwd,
         )
-        frame = CommandFrame(
-            header=header,
-            spec=spec,
-            positional=list(positional or []),
-            keyword=dict(keyword or {}),
-        )
-        raw = codec.encode_command(frame)
-        self._write(raw)
-        pending = PendingCommand(frame=frame, raw_line=raw)
-        self._install_timeout(pending)
-        self.frame_sent.emit(frame, raw)
-        self.raw_sent.emit(raw)
-        return pending
+        return CommandFrame(header=header, spec=spec, positional=positional, keyword=keyword)
 
-    def send_frame(self, frame: CommandFrame) -> PendingCommand:
-        raw = codec.encode_command(frame)
-        self._write(raw)
-        pending = PendingCommand(frame=frame, raw_line=raw)
-        self._install_timeout(pending)
-        self.frame_sent.emit(frame, raw)
-        self.raw_sent.emit(raw)
-        return pending
+    def _make_entry(
+        self, frame: CommandFrame, waiter: Optional[Future] = None, max_buffer: int = 1024
+    ) -> _PendingEntry:
+        try:
+            data = self._encoder_for(frame.header.device_id).encode_frame(frame)
+        except Exception:
+            # Argumentos/PWD inválidos: la secuencia ya reservada no debe quedar tomada
+            self._sequences.release(frame.header.device_id, frame.header.sequence)
+            raise
+        pending = PendingCommand(frame=frame, raw_line=data.decode("ascii"))
+        entry = _PendingEntry(command=pending, data=data)
+        if waiter is not None:
+            entry.waiters.append(waiter)
+        if frame.spec.stream:
+            entry.stream = ResponseStream(pending, max_buffer)
+        return entry
+
+    def _enqueue(self, frame: CommandFrame, waiter: Optional[Future] = None, max_buffer: int = 1024) -> _PendingEntry:
+        if not self._serial.is_connected():
+            self._sequences.release(frame.header.device_id, frame.header.sequence)
+            raise RuntimeError("El puerto serial no está conectado")
+        entry = self._make_entry(frame, waiter, max_buffer)
+        if self._queued or self._window_is_full():
+            self._push_backlog(entry)
+        else:
+            self._transmit(entry)
+        return entry
 
-    def pending(self) -> Dict[int, PendingCommand]:
-        return {seq: entry.command for seq, entry in self._pending.items()}
+    def _encoder_for(self, device_id: str) -> codec.CommandEncoder:
+        encoder = self._encoders.get(device_id)
+        if encoder is None:
+            encoder = self._encoders[device_id] = codec.CommandEncoder(self._model, device_id)
+        return encoder
+
+    def _push_backlog(self, entry: _PendingEntry) -> None:
+        frame = entry.command.frame
+        spec = frame.spec
+        queue = self._backlog[min(max(spec.priority, 0), PRIORITY_POLL)]
+        if spec.coalesce:
+            key = (frame.header.device_id, spec.name)
+            stale = self._coalescing.get(key)
+            self._coalescing[key] = entry
+            if stale is not None:
+                self._release(stale)
+                # Ocupa el lugar del anterior; quien lo esperaba recibe la respuesta del vigente
+                queue[queue.index(stale)] = entry
+                entry.waiters[:0] = stale.waiters
+                self._coalesced += 1
+                self._bytes_saved += len(stale.data)
+                self.command_coalesced.emit(stale.command, entry.command)
+                return
+        queue.append(entry)
+        self._queued += 1
+
+    def _pop_backlog(self) -> _PendingEntry:
+        for queue in self._backlog:
+            if queue:
+                entry = queue.popleft()
+                self._queued -= 1
+                frame = entry.command.frame
+                key = (frame.header.device_id, frame.spec.name)
+                if self._coalescing.get(key) is entry:
+                    del self._coalescing[key]
+                return entry
+        raise IndexError("backlog vacío")
+
+    def pending(self) -> Dict[Tuple[str, int], PendingCommand]:
+        """Comandos en vuelo (enviados y esperando respuesta), por (device_id, secuencia)."""
+        return {key: entry.command for key, entry in self._pending.items()}
+
+    def cancel_all(self) -> int:
+        """Descarta lo que está en vuelo y en cola; sus futures fallan con ``CancelledError``."""
+        entries = [entry for _key, entry in self._pending.items()]
+        for queue in self._backlog:
+            entries.extend(queue)
+            queue.clear()
+        self._queued = 0
+        self._coalescing.clear()
+        for entry in entries:
+            header = entry.command.frame.header
+            self._pending.pop(header.device_id, header.sequence)
+            self._scheduler.cancel(entry)
+            self._release(entry)
+            self._settle(entry, error=CancelledError())
+        self._update_window_state()
+        return len(entries)
+
+    def queued(self) -> list[PendingCommand]:
+        """Comandos codificados que esperan lugar en la ventana, en orden de salida."""
+        return [entry.command for queue in self._backlog for entry in queue]
+
+    # ------------------------------------------------------------------
+    @property
+    def window_size(self) -> Optional[int]:
+        return self._window_size
+
+    @window_size.setter
+    def window_size(self, value: Optional[int]) -> None:
+        self._window_size = value
+        self._pump()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    @property
+    def backlog_size(self) -> int:
+        return self._queued
+
+    @property
+    def coalesced(self) -> int:
+        """Envíos descartados por quedar superados por uno posterior en cola."""
+        return self._coalesced
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes que no se transmitieron gracias al coalescing."""
+        return self._bytes_saved
+
+    def _window_is_full(self, extra: int = 0) -> bool:
+        return self._window_size is not None and len(self._pending) + extra >= self._window_size
+
+    def _update_window_state(self) -> None:
+        full = self._window_is_full()
+        if full != self._window_was_full:
+            self._window_was_full = full
+            self.window_full.emit(full)
+
+    def _transmit(self, entry: _PendingEntry) -> None:
+        self._transmit_many([entry])
+
+    def _transmit_many(self, entries: List[_PendingEntry]) -> int:
+        """Envía varios frames concatenados en una sola escritura."""
+        if not entries:
+            return 0
+        data = b"".join(entry.data for entry in entries)
+        self._write(data)
+        for entry in entries:
+            self._install_timeout(entry)
+            self._sent += 1
+            command = entry.command
+            self.frame_sent.emit(command.frame, command.raw_line)
+            self.raw_sent.emit(command.raw_line)
+        self._update_window_state()
+        return len(data)
+
+    def _pump(self) -> None:
+        """Libera comandos del backlog mientras haya lugar en la ventana."""
+        ready: List[_PendingEntry] = []
+        if self._serial.is_connected():
+            while self._queued and not self._window_is_full(len(ready)):
+                ready.append(self._pop_backlog())
+        self._transmit_many(ready)
+        self._update_window_state()
+
+    def _on_connection_changed(self, connected: bool, _port: str) -> None:
+        if connected:
+            self._pump()
 
     # ------------------------------------------------------------------
-    def _install_timeout(self, pending: PendingCommand) -> None:
-        timer = QtCore.QTimer(self)
-        timer.setSingleShot(True)
-        timer.setInterval(self._timeout_ms)
-        seq = pending.frame.header.sequence
-        timer.timeout.connect(lambda seq=seq: self._on_timeout(seq))
-        timer.start()
-        self._pending[seq] = _PendingEntry(command=pending, timer=timer)
-
-    def _finalize_pending(self, seq: int) -> Optional[PendingCommand]:
-        entry = self._pending.pop(seq, None)
+    @property
+    def events(self) -> EventBus:
+        return self._events
+
+    def subscribe(
+        self,
+        pattern: str,
+        callback: EventCallback,
+        *,
+        dev: Optional[str] = None,
+        max_queue: int = 256,
+    ) -> Subscription:
+        """Atajo de ``events.subscribe``: p. ej. ``subscribe("RF.*", cb, dev="A1B2C3")``."""
+        return self._events.subscribe(pattern, callback, dev=dev, max_queue=max_queue)
+
+    @property
+    def cache(self) -> ResponseCache:
+        """Caché de respuestas (contadores hits/misses/evictions)."""
+        return self._cache
+
+    def _remember(self, entry: _PendingEntry, response: Optional[ResponseEnvelope]) -> None:
+        frame = entry.command.frame
+        spec = frame.spec
+        if spec.invalidates:
+            self._cache.invalidate(frame.header.device_id, spec.invalidates)
+        if spec.cache_ttl_ms and response is not None:
+            key = cache_key(frame.header.device_id, spec.name, frame.positional, frame.keyword)
+            self._cache.put(key, response, spec.cache_ttl_ms)
+
+    @property
+    def live_deadlines(self) -> int:
+        """Deadlines vivos en el scheduler (incluye los de otros servicios si es compartido)."""
+        return self._scheduler.live
+
+    def _timeout_for(self, spec: CommandSpec) -> int:
+        return spec.timeout_ms if spec.timeout_ms is not None else self._timeout_ms
+
+    def _install_timeout(self, entry: _PendingEntry) -> None:
+        frame = entry.command.frame
+        stale = self._pending.put(frame.header.device_id, frame.header.sequence, entry)
+        if stale is not None and stale is not entry:
+            # No debería pasar (las secuencias se reservan), pero si pasa el
+            # anterior ya no puede recibir respuesta: se cancela, no se abandona
+            self._scheduler.cancel(stale)
+            self._settle(stale, error=CancelledError())
+        self._scheduler.schedule(entry, self._timeout_for(frame.spec), lambda: self._on_timeout(entry))
+
+    def _finalize_pending(
+        self, device_id: str, seq: int, response: Optional[ResponseEnvelope] = None
+    ) -> Optional[PendingCommand]:
+        entry = self._pending.pop(device_id, seq)
         if entry is None:
             return None
-        entry.timer.stop()
-        entry.timer.deleteLater()
+        self._scheduler.cancel(entry)
+        self._release(entry)
+        if entry.attempt:
+            self._recovered += 1
+        if response is not None and response.is_error():
+            self._settle(entry, error=CommandError(response))
+        else:
+            if entry.stream is not None:
+                entry.stream.finish(response)
+            self._remember(entry, response)
+            self._settle(entry, result=response)
+        self._pump()
         return entry.command
 
-    def _write(self, raw: str) -> None:
+    def _release(self, entry: _PendingEntry) -> None:
+        header = entry.command.frame.header
+        self._sequences.release(header.device_id, header.sequence)
+
+    @staticmethod
+    def _settle(
+        entry: _PendingEntry,
+        result: Optional[ResponseEnvelope] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if error is not None and entry.stream is not None:
+            entry.stream.fail(error)
+        for waiter in entry.waiters:
+            if waiter.done():  # cancelado por quien esperaba
+                continue
+            if error is not None:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(result)
+
+    def _write(self, data: bytes) -> None:
         if not self._serial.is_connected():
             raise RuntimeError("El puerto serial no está conectado")
-        self._serial.send_data_bytes(raw.encode("ascii"))
+        self._serial.send_data_bytes(data)
 
     # ------------------------------------------------------------------
-    def _on_serial_data(self, chunk: bytes, port: str) -> None:  # noqa: ARG002
-        try:
-            text = chunk.decode("ascii", errors="ignore")
-        except Exception:
-            text = chunk.decode("latin1", errors="ignore")
-        self._rx_buffer += text
-        while "\n" in self._rx_buffer:
-            line, self._rx_buffer = self._consume_line(self._rx_buffer)
-            if not line:
-                continue
-            self._dispatch_line(line)
+    @property
+    def frame_reader(self) -> qc1_proto.QC1FrameReader:
+        """Framer del flujo RX (contadores frames/bytes_dropped/overflows)."""
+        return self._reader
 
-    def _consume_line(self, buffer: str) -> tuple[str, str]:
-        idx = buffer.find("\n")
-        line = buffer[:idx].rstrip("\r")
-        rest = buffer[idx + 1 :]
-        return line, rest
+    def _on_serial_data(self, chunk: bytes, port: str) -> None:  # noqa: ARG002
+        for frame in self._reader.feed(chunk):
+            self._dispatch_line(frame)
 
-    def _dispatch_line(self, line: str) -> None:
+    def _dispatch_line(self, line: bytes) -> None:
         try:
-            if line.startswith(qc1_proto.QC1_SIGNATURE + ","):
+            if line.startswith(_PACKET_PREFIX):
                 pkt = codec.decode_packet(line)
                 self.packet_received.emit(pkt)
-                self._finalize_pending(pkt.hdr.seq)
+                entry = self._pending.get(pkt.hdr.dev, pkt.hdr.seq)
+                if entry is not None and entry.stream is None:  # el eco no cierra un stream
+                    self._finalize_pending(pkt.hdr.dev, pkt.hdr.seq)
             else:
                 resp = codec.decode_response(line)
                 self.response_received.emit(resp)
-                self._finalize_pending(resp.sequence)
+                if resp.prefix == "EVT":
+                    self._events.publish(resp)
+                entry = self._pending.get(resp.device, resp.sequence)
+                if entry is not None and entry.stream is not None and not self._ends_stream(resp):
+                    entry.stream.push(resp)
+                    idle_ms = entry.command.frame.spec.stream_idle_ms
+                    if idle_ms:
+                        self._scheduler.schedule(entry, idle_ms, lambda: self._on_stream_idle(entry))
+                    else:
+                        timeout = self._timeout_for(entry.command.frame.spec)
+                        self._scheduler.schedule(entry, timeout, lambda: self._on_timeout(entry))
+                else:
+                    self._finalize_pending(resp.device, resp.sequence, resp)
         except Exception as exc:
-            self.parse_failed.emit(f"No se pudo interpretar: {line} ({exc})")
+            text = line.decode("ascii", errors="replace")
+            self.parse_failed.emit(f"No se pudo interpretar: {text} ({exc})")
+
+    @staticmethod
+    def _ends_stream(resp: ResponseEnvelope) -> bool:
+        if resp.is_error():
+            return True
+        fields = resp.fields
+        return resp.prefix == "OK" and bool(fields) and fields[0] == qc1_proto.QC1_STREAM_END
+
+    def _on_stream_idle(self, entry: _PendingEntry) -> None:
+        """Sin END tras ``stream_idle_ms``: lo recibido es la respuesta completa."""
+        header = entry.command.frame.header
+        if self._pending.get(header.device_id, header.sequence) is entry:
+            self._finalize_pending(header.device_id, header.sequence)
 
-    def _on_timeout(self, seq: int) -> None:
-        command = self._finalize_pending(seq)
-        if command is not None:
-            self.command_timed_out.emit(command)
+    def _on_timeout(self, entry: _PendingEntry) -> None:
+        header = entry.command.frame.header
+        if self._pending.get(header.device_id, header.sequence) is not entry:
+            return
+        policy = entry.command.frame.spec.retry
+        if entry.stream is not None and entry.stream.received:
+            policy = None  # reintentar duplicaría lo ya entregado
+        if policy is not None and entry.attempt < policy.max_retries and self._serial.is_connected():
+            # Conserva su lugar en la ventana; una respuesta tardía durante el backoff lo cierra
+            entry.attempt += 1
+            delay = policy.delay_ms(entry.attempt, self._rng.random())
+            self._scheduler.schedule(entry, delay, lambda: self._retry(entry))
+            return
+        self._expire(entry)
+
+    def _retry(self, entry: _PendingEntry) -> None:
+        command = entry.command
+        header = command.frame.header
+        if self._pending.get(header.device_id, header.sequence) is not entry:
+            return
+        if not self._serial.is_connected():
+            self._expire(entry)
+            return
+        if not command.frame.spec.retry.same_sequence:
+            self._pending.pop(header.device_id, header.sequence)
+            self._release(entry)
+            header = replace(header, sequence=self._sequences.allocate(header.device_id))
+            command.frame = replace(command.frame, header=header)
+            entry.data = self._encoder_for(header.device_id).encode_frame(command.frame)
+            command.raw_line = entry.data.decode("ascii")
+        self._write(entry.data)
+        self._install_timeout(entry)
+        self._retries += 1
+        self.command_retried.emit(command, entry.attempt)
+        self.frame_sent.emit(command.frame, command.raw_line)
+        self.raw_sent.emit(command.raw_line)
+
+    def _expire(self, entry: _PendingEntry) -> None:
+        header = entry.command.frame.header
+        self._pending.pop(header.device_id, header.sequence)
+        self._release(entry)
+        if entry.attempt:
+            self._exhausted += 1
+        self._settle(entry, error=CommandTimeout(entry.command))
+        self.command_timed_out.emit(entry.command)
+        self._pump()
+
+    # ------------------------------------------------------------------
+    def retry_metrics(self) -> Dict[str, float]:
+        """Contadores de reintentos: ``rate`` = reintentos por comando transmitido."""
+        return {
+            "sent": self._sent,
+            "retries": self._retries,
+            "recovered": self._recovered,
+            "exhausted": self._exhausted,
+            "rate": self._retries / self._sent if self._sent else 0.0,
+        }
 
 
 __all__ = ["SerialCommandService"]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Deque, Iterator, List, Optional
+
+from .models import PendingCommand, ResponseEnvelope
+
+
+class ResponseStream:
+    """Respuestas parciales de un comando ``stream`` (p. ej. ``LOGS.PULL?``).
+
+    El servicio entrega cada frame con ``push`` y cierra con ``finish``/``fail``
+    al llegar el terminador, un ``ERR``, el plazo ``stream_idle_ms`` sin frames
+    nuevos (``terminator`` queda en None) o el timeout. El buffer es acotado: si
+    el consumidor no drena a tiempo se descartan los frames más viejos y se
+    cuentan en ``dropped``. Para no perder nada, consumir con ``on_item``.
+
+    Consumo no bloqueante desde la GUI con ``drain()``, o desde asyncio (event
+    loop integrado con Qt) con ``async for response in stream``.
+    """
+
+    def __init__(self, command: PendingCommand, max_buffer: int = 1024) -> None:
+        if max_buffer <= 0:
+            raise ValueError("max_buffer debe ser positivo")
+        self.command = command
+        self.max_buffer = max_buffer
+        self._buffer: Deque[ResponseEnvelope] = deque()
+        self._listeners: List[Callable[[ResponseEnvelope], None]] = []
+        self._wakeup: Optional[asyncio.Future] = None
+        self.received = 0
+        self.dropped = 0
+        self.terminator: Optional[ResponseEnvelope] = None
+        # Resuelve con el total de frames recibidos, o falla con CommandError/CommandTimeout
+        self.future: "Future[int]" = Future()
+
+    @property
+    def closed(self) -> bool:
+        return self.future.done()
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def on_item(self, callback: Callable[[ResponseEnvelope], None]) -> None:
+        """Recibe cada frame al llegar, además de quedar en el buffer."""
+        self._listeners.append(callback)
+
+    # --- lado productor (SerialCommandService) ---------------------------
+    def push(self, response: ResponseEnvelope) -> None:
+        self.received += 1
+        for callback in self._listeners:
+            callback(response)
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self.dropped += 1
+        self._buffer.append(response)
+        self._wake()
+
+    def finish(self, terminator: Optional[ResponseEnvelope]) -> None:
+        self.terminator = terminator
+        if not self.future.done():
+            self.future.set_result(self.received)
+        self._wake()
+
+    def fail(self, error: BaseException) -> None:
+        if not self.future.done():
+            self.future.set_exception(error)
+        self._wake()
+
+    # --- lado consumidor --------------------------------------------------
+    def drain(self) -> Iterator[ResponseEnvelope]:
+        """Generador con lo ya recibido; no espera frames nuevos."""
+        while self._buffer:
+            yield self._buffer.popleft()
+
+    def __aiter__(self) -> AsyncIterator[ResponseEnvelope]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[ResponseEnvelope]:
+        while True:
+            while self._buffer:
+                yield self._buffer.popleft()
+            if self.closed:
+                error = self.future.exception()
+                if error is not None:
+                    raise error
+                return
+            self._wakeup = asyncio.get_running_loop().create_future()
+            await self._wakeup
+
+    def _wake(self) -> None:
+        waiter, self._wakeup = self._wakeup, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+
+__all__ = ["ResponseStream"]
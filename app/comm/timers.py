@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+from PyQt6 import QtCore
+
+
+class TimerWheel:
+    """Rueda de temporización hasheada: alta/baja O(1), vencimiento por ticks.
+
+    Cada deadline se guarda en la ranura ``tick % slots`` junto con su tick
+    absoluto de vencimiento; ``advance`` sólo recorre las ranuras de los ticks
+    transcurridos, así que el costo no depende de cuántos deadlines hay vivos.
+    """
+
+    def __init__(self, tick_ms: int = 50, slots: int = 512) -> None:
+        if tick_ms <= 0 or slots <= 0:
+            raise ValueError("tick_ms y slots deben ser positivos")
+        self.tick_ms = tick_ms
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._where: Dict[Hashable, int] = {}
+        self._tick: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def schedule(self, key: Hashable, delay_ms: int, now_ms: int) -> None:
+        """Programa (o reprograma) ``key`` para vencer en ``delay_ms``."""
+        self.cancel(key)
+        if self._tick is None:
+            self._tick = now_ms // self.tick_ms
+        due = max(-(-(now_ms + max(delay_ms, 0)) // self.tick_ms), self._tick + 1)
+        slot = due % len(self._slots)
+        self._slots[slot][key] = due
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    def advance(self, now_ms: int) -> List[Hashable]:
+        """Avanza el reloj hasta ``now_ms`` y devuelve las claves vencidas."""
+        target = now_ms // self.tick_ms
+        if self._tick is None or target <= self._tick:
+            return []
+        expired: List[Hashable] = []
+        n = len(self._slots)
+        for tick in range(self._tick + 1, min(target, self._tick + n) + 1):
+            bucket = self._slots[tick % n]
+            if not bucket:
+                continue
+            due_keys = [k for k, due in bucket.items() if due <= target]
+            for key in due_keys:
+                del bucket[key]
+                del self._where[key]
+            expired.extend(due_keys)
+        self._tick = target
+        return expired
+
+
+class DeadlineScheduler(QtCore.QObject):
+    """Agenda de deadlines sobre un único QTimer periódico.
+
+    Reemplaza un ``QTimer`` por comando: los callbacks se registran con una clave
+    hashable y vencen en el tick siguiente a su plazo. El timer sólo corre
+    mientras haya deadlines vivos. Puede compartirse entre varios servicios.
+    """
+
+    def __init__(
+        self,
+        tick_ms: int = 50,
+        slots: int = 512,
+        parent: Optional[QtCore.QObject] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(parent)
+        self._clock = clock
+        self._wheel = TimerWheel(tick_ms, slots)
+        self._callbacks: Dict[Hashable, Callable[[], None]] = {}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(tick_ms)
+        self._timer.timeout.connect(self._on_tick)
+
+    def _now_ms(self) -> int:
+        return int(self._clock() * 1000)
+
+    @property
+    def live(self) -> int:
+        """Cantidad de deadlines pendientes."""
+        return len(self._wheel)
+
+    def schedule(self, key: Hashable, delay_ms: int, callback: Callable[[], None]) -> None:
+        self._wheel.schedule(key, delay_ms, self._now_ms())
+        self._callbacks[key] = callback
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self, key: Hashable) -> bool:
+        self._callbacks.pop(key, None)
+        found = self._wheel.cancel(key)
+        if not self._callbacks:
+            self._timer.stop()
+        return found
+
+    def _on_tick(self) -> None:
+        for key in self._wheel.advance(self._now_ms()):
+            callback = self._callbacks.pop(key, None)
+            if callback is not None:
+                callback()
+        if not self._callbacks:
+            self._timer.stop()
+
+
+__all__ = ["TimerWheel", "DeadlineScheduler"]
@@ -19,7 +19,10 @@ class DeviceController(QtCore.QObject):
         self.win = win
         self.settings = settings
 
-        self.serial = SerialManager()
+        self.serial = SerialManager(baud_cache=settings.baud_cache)
+        if settings.autobaud:
+            self.serial.set_autobaud(settings.device_model, settings.device_id)
+        self.serial.baud_detected.connect(self._on_baud_detected)
         # Comandos serial deshabilitados temporalmente mientras se ajusta la UI.
         self._commands_enabled = False
 
@@ -107,6 +110,10 @@ class DeviceController(QtCore.QObject):
         else:
             self._log(f"[serial] No se pudo abrir {port}")
 
+    def _on_baud_detected(self, port: str, baud: int) -> None:
+        self._log(f"[serial] {port}: {baud} baudios detectados")
+        self.settings.save("app/data/settings.json")
+
     def _on_ports_updated(self, ports: list[str]) -> None:
         combo = self.win.topbar.port_combo
         block = combo.blockSignals(True)
@@ -18,9 +18,14 @@ Checksum:
 
 Public API (summary):
     - parse_line(line: str) -> QC1Packet
+    - parse_line_bytes(data: bytes) / parse_response_bytes(data: bytes) -> same types,
+      straight from serial RX buffers without a str round-trip
+    - scan_response(data, start, end) -> header + field offsets, for columnar decoders
     - build_command(model, dev, seq, ts, cmd, *positional, pwd=None, **kv) -> str
     - Dispatcher: QC1Dispatcher with register_handler(name, fn, flags=...)
-    - Helpers: build_ok(...), build_err(...), build_evt(...)
+    - Helpers: build_ok(...), build_err(...), build_evt(...), build_stream_end(...)
+    - Checksum: xor_checksum_ascii(s), QC1Checksum for incremental folding
+    - Framing: QC1FrameReader splits the raw serial stream into frames
     - Blob: QC1BlobSession for chunked uploads/downloads management
 
 Author: <tu nombre>
@@ -29,8 +34,9 @@ Author: <tu nombre>
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any, Union
 import re
+import sys
 import base64
 
 # ---------------------------
@@ -50,6 +56,10 @@ QCF_NEED_PWD   = 0x01   # requires PWD to be present & valid
 QCF_READONLY   = 0x02   # does not mutate state
 QCF_STREAM     = 0x04   # emits multiple responses
 
+# Streamed commands answer with several OK/EVT frames sharing the request seq
+# and close with an OK whose first field is this marker (or with an ERR).
+QC1_STREAM_END = "END"
+
 # Error codes
 QC1_OK                 = 200
 QC1_ERR_SYNTAX         = 400
@@ -65,7 +75,15 @@ QC1_ERR_INTERNAL       = 500
 # Types
 # ---------------------------
 
-@dataclass
+# Protocol objects are kept by the hundred thousand in capture tooling, so they
+# carry no per-instance __dict__ (dataclass(slots=...) needs Python 3.10+).
+# Public so app.comm.models can apply the same setting.
+DATACLASS_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# model/dev/cmd/prefix repeat on every frame: parsers share one str object each
+_intern = sys.intern
+
+@dataclass(**DATACLASS_SLOTS)
 class QC1Header:
     model: str
     dev: str
@@ -73,13 +91,53 @@ class QC1Header:
     ts: int
     cmd: str
 
-@dataclass
 class QC1Packet:
-    hdr: QC1Header
-    # Split args into: positional list and dict of k=v pairs
-    positional: List[str] = field(default_factory=list)
-    kv: Dict[str, str] = field(default_factory=dict)
-    pwd: str = ""
+    """Parsed command frame.
+
+    Args are split into a positional list and a dict of k=v pairs. When built
+    by the parsers only the header is decoded up front: `positional`/`kv` keep
+    an offset into the original payload and are materialized (and cached) on
+    first access."""
+
+    __slots__ = ("hdr", "pwd", "_src", "_args_at", "_positional", "_kv")
+
+    def __init__(self, hdr: QC1Header, positional: Optional[List[str]] = None,
+                 kv: Optional[Dict[str, str]] = None, pwd: str = "", *,
+                 src: Union[str, bytes] = "", args_at: int = 0) -> None:
+        self.hdr = hdr
+        self.pwd = pwd
+        self._src = src
+        self._args_at = args_at
+        self._positional = positional if positional is not None or src else []
+        self._kv = kv if kv is not None or src else {}
+
+    def _materialize(self) -> None:
+        self._positional, self._kv, _ = _split_args(csv_split_q(_tail(self._src, self._args_at)))
+        self._src = ""
+
+    @property
+    def positional(self) -> List[str]:
+        if self._positional is None:
+            self._materialize()
+        return self._positional
+
+    @positional.setter
+    def positional(self, value: List[str]) -> None:
+        if self._kv is None:
+            self._materialize()
+        self._positional = value
+
+    @property
+    def kv(self) -> Dict[str, str]:
+        if self._kv is None:
+            self._materialize()
+        return self._kv
+
+    @kv.setter
+    def kv(self, value: Dict[str, str]) -> None:
+        if self._positional is None:
+            self._materialize()
+        self._kv = value
 
     def get_pos(self, idx: int) -> Optional[str]:
         return self.positional[idx] if 0 <= idx < len(self.positional) else None
@@ -87,25 +145,57 @@ class QC1Packet:
     def get_kv(self, key: str) -> Optional[str]:
         return self.kv.get(key)
 
-@dataclass
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QC1Packet):
+            return NotImplemented
+        return (self.hdr, self.positional, self.kv, self.pwd) == \
+            (other.hdr, other.positional, other.kv, other.pwd)
+
+    def __repr__(self) -> str:
+        return (f"QC1Packet(hdr={self.hdr!r}, positional={self.positional!r}, "
+                f"kv={self.kv!r}, pwd={self.pwd!r})")
+
 class QC1Response:
-    """Parsed response frame (OK/ERR/EVT)."""
-    prefix: str
-    dev: str
-    seq: int
-    ts: int
-    fields: List[str] = field(default_factory=list)
+    """Parsed response frame (OK/ERR/EVT).
+
+    prefix/dev/seq/ts are decoded by the parser; `fields` is split from the
+    original payload on first access and cached, as is the as_dict() map, so
+    frames that are only routed by header never pay for it."""
+
+    __slots__ = ("prefix", "dev", "seq", "ts", "_src", "_fields_at", "_fields", "_dict")
+
+    def __init__(self, prefix: str, dev: str, seq: int, ts: int,
+                 fields: Optional[List[str]] = None, *,
+                 src: Union[str, bytes] = "", fields_at: int = 0) -> None:
+        self.prefix = prefix
+        self.dev = dev
+        self.seq = seq
+        self.ts = ts
+        self._src = src
+        self._fields_at = fields_at
+        self._fields = fields if fields is not None or src else []
+        self._dict: Optional[Dict[str, str]] = None
+
+    @property
+    def fields(self) -> List[str]:
+        if self._fields is None:
+            self._fields = csv_split_q(_tail(self._src, self._fields_at))
+            self._src = ""
+        return self._fields
+
+    @fields.setter
+    def fields(self, value: List[str]) -> None:
+        self._fields = value
+        self._src = ""
+        self._dict = None
 
     def as_list(self) -> List[str]:
         return list(self.fields)
 
     def as_dict(self) -> Dict[str, str]:
-        data: Dict[str, str] = {}
-        for item in self.fields:
-            if "=" in item:
-                key, value = item.split("=", 1)
-                data[key] = value
-        return data
+        if self._dict is None:
+            self._dict = _fields_dict(self.fields)
+        return dict(self._dict)
 
     def is_ok(self) -> bool:
         return self.prefix.upper() == "OK"
@@ -125,6 +215,20 @@ class QC1Response:
             return int(code_str), message
         except ValueError:
             return None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QC1Response):
+            return NotImplemented
+        return (self.prefix, self.dev, self.seq, self.ts, self.fields) == \
+            (other.prefix, other.dev, other.seq, other.ts, other.fields)
+
+    def __repr__(self) -> str:
+        return (f"QC1Response(prefix={self.prefix!r}, dev={self.dev!r}, seq={self.seq!r}, "
+                f"ts={self.ts!r}, fields={self.fields!r})")
+
+# Raw frame buffers accepted by the bytes-native parsers
+BytesLike = Union[bytes, bytearray, memoryview]
+
 # Handler signature
 QC1Handler = Callable[[QC1Packet, "QC1Context"], List[str]]
 
@@ -143,11 +247,75 @@ class QC1Context:
 # Checksum & utils
 # ---------------------------
 
+# Below this size a plain byte loop beats the big-int folding below
+_XOR_FOLD_MIN = 128
+_fold_masks: Dict[int, int] = {}
+
+def _xor_bytes(data: BytesLike) -> int:
+    """XOR of every byte in `data`.
+
+    Larger buffers are loaded as one little-endian integer and folded in halves
+    (hi ^ lo) until a single byte is left, so the work runs in C over machine
+    words instead of one Python iteration per byte."""
+    n = len(data)
+    if n < _XOR_FOLD_MIN:
+        acc = 0
+        for b in data:
+            acc ^= b
+        return acc
+    acc = int.from_bytes(data, "little")
+    width = 8 << (n - 1).bit_length()   # bits, power of two covering the buffer
+    while width > 8:
+        width >>= 1
+        mask = _fold_masks.get(width)
+        if mask is None:
+            mask = _fold_masks[width] = (1 << width) - 1
+        acc = (acc >> width) ^ (acc & mask)
+    return acc
+
 def xor_checksum_ascii(s: str) -> str:
-    acc = 0
-    for b in s.encode("ascii", "strict"):
-        acc ^= b
-    return f"{acc:02X}"
+    return f"{_xor_bytes(s.encode('ascii', 'strict')):02X}"
+
+
+class QC1Checksum:
+    """Incremental XOR checksum.
+
+    Lets streaming builders/parsers fold the payload as it arrives instead of
+    running a second pass over the complete frame:
+
+        cs = QC1Checksum(b"QC1,ALR-LTE,A1B2C3,")
+        cs.update(b"0012,0,SYS.INFO?")
+        cs.hexdigest()  # -> same as xor_checksum_ascii(whole payload)
+    """
+
+    __slots__ = ("_acc",)
+
+    def __init__(self, data: BytesLike = b"") -> None:
+        self._acc = _xor_bytes(data) if data else 0
+
+    def update(self, data: BytesLike) -> "QC1Checksum":
+        self._acc ^= _xor_bytes(data)
+        return self
+
+    def update_str(self, s: str) -> "QC1Checksum":
+        self._acc ^= _xor_bytes(s.encode("ascii", "strict"))
+        return self
+
+    def copy(self) -> "QC1Checksum":
+        other = QC1Checksum()
+        other._acc = self._acc
+        return other
+
+    @property
+    def value(self) -> int:
+        return self._acc
+
+    def hexdigest(self) -> str:
+        return f"{self._acc:02X}"
+
+# Hex digit value per byte (both cases), used to read the checksum without decoding
+_HEX_NIBBLE: Dict[int, int] = {c: i for i, c in enumerate(b"0123456789ABCDEF")}
+_HEX_NIBBLE.update({c: i for i, c in enumerate(b"abcdef", 10)})
 
 _pwd_re = re.compile(r"^\d{6,10}$")
 
@@ -162,34 +330,21 @@ def _rstrip_crlf(s: str) -> str:
 # CSV parsing with quotes
 # ---------------------------
 
+# One token per match: a quoted field (closing quote optional, so an unbalanced
+# quote runs to the end) or an unquoted field. Commas never start a token, so
+# findall() skips them just like the original scanner did.
+_csv_token_re = re.compile(r'"([^"]*)"?|([^,"][^,]*)')
+
 def csv_split_q(s: str) -> List[str]:
     """Split CSV with support for quoted fields. No escapes inside quotes;
-    quotes must be balanced. Example: a,b,\"Hello, world\",c"""
-    out: List[str] = []
-    i, n = 0, len(s)
-    while i < n:
-        # skip commas
-        if s[i] == ",":
-            i += 1
-            continue
-        if s[i] == '"':
-            # quoted field
-            i += 1
-            start = i
-            while i < n and s[i] != '"':
-                i += 1
-            out.append(s[start:i])
-            i += 1  # skip closing quote
-            if i < n and s[i] == ",":
-                i += 1
-        else:
-            start = i
-            while i < n and s[i] != ",":
-                i += 1
-            out.append(s[start:i])
-            if i < n and s[i] == ",":
-                i += 1
-    return out
+    quotes must be balanced. Example: a,b,\"Hello, world\",c
+
+    Empty fields are skipped. Frames without any '"' (the common case) go
+    through str.split; only quoted payloads use the regex tokenizer."""
+    if '"' not in s:
+        return [f for f in s.split(",") if f]
+    # unquoted tokens are never empty, so `u or q` picks the right group
+    return [u or q for q, u in _csv_token_re.findall(s)]
 
 
 # ---------------------------
@@ -222,32 +377,42 @@ def parse_line(line: str) -> QC1Packet:
     if calc.upper() != cs_hex.upper():
         raise QC1ParseError(f"checksum mismatch: have {cs_hex}, want {calc}")
 
-    fields = csv_split_q(payload)
-    if len(fields) < 6:
-        raise QC1ParseError("need at least 6 fields: QC1,model,dev,seq,ts,cmd")
-
-    if fields[0] != QC1_SIGNATURE:
-        raise QC1ParseError("bad signature")
+    return _packet_from_payload(payload)
 
-    model, dev = fields[1], fields[2]
-    try:
-        seq = int(fields[3])
-    except Exception:
-        raise QC1ParseError("bad seq")
-    if seq < 1 or seq > 9999:
-        raise QC1ParseError("seq out of range")
 
-    try:
-        ts = int(fields[4])
-    except Exception:
-        ts = 0
+def _split_head(payload: str, n: int) -> Optional[Tuple[List[str], int]]:
+    """Split the first `n` fields off `payload` without touching the rest.
 
-    cmd = fields[5]
+    Returns (fields, offset where the remaining fields start) such that
+    fields + csv_split_q(payload[offset:]) == csv_split_q(payload), or None
+    when the payload has fewer than `n` fields."""
+    fields = payload.split(",", n)
+    if len(fields) > n:
+        pos = len(payload) - len(fields.pop())
+    else:
+        pos = len(payload)
+    if len(fields) < n or "" in fields or payload.find('"', 0, pos) != -1:
+        return _split_head_q(payload, n)
+    return fields, pos
+
+def _split_head_q(payload: str, n: int) -> Optional[Tuple[List[str], int]]:
+    # Slow path for quoted/empty header fields: same tokens as csv_split_q
+    fields: List[str] = []
+    pos = 0
+    for m in _csv_token_re.finditer(payload):
+        q, u = m.groups()
+        fields.append(u or q)
+        pos = m.end()
+        if len(fields) == n:
+            return fields, pos
+    return None
+
+def _split_args(fields: List[str]) -> Tuple[List[str], Dict[str, str], str]:
     positional: List[str] = []
     kv: Dict[str, str] = {}
     pwd = ""
 
-    for f in fields[6:]:
+    for f in fields:
         if f.startswith("PWD="):
             pwd = f[4:]
             continue
@@ -258,18 +423,54 @@ def parse_line(line: str) -> QC1Packet:
             key = f[:eq]
             val = f[eq+1:]
             kv[key] = val
+    return positional, kv, pwd
+
+def _fields_dict(fields: List[str]) -> Dict[str, str]:
+    data: Dict[str, str] = {}
+    for item in fields:
+        if "=" in item:
+            key, value = item.split("=", 1)
+            data[key] = value
+    return data
+
+def _packet_header(fields: List[str]) -> QC1Header:
+    if fields[0] != QC1_SIGNATURE:
+        raise QC1ParseError("bad signature")
+
+    model, dev = _intern(fields[1]), _intern(fields[2])
+    try:
+        seq = int(fields[3])
+    except Exception:
+        raise QC1ParseError("bad seq")
+    if seq < 1 or seq > 9999:
+        raise QC1ParseError("seq out of range")
+
+    try:
+        ts = int(fields[4])
+    except Exception:
+        ts = 0
+
+    return QC1Header(model=model, dev=dev, seq=seq, ts=ts, cmd=_intern(fields[5]))
+
+def _packet_from_fields(fields: List[str]) -> QC1Packet:
+    if len(fields) < 6:
+        raise QC1ParseError("need at least 6 fields: QC1,model,dev,seq,ts,cmd")
+    hdr = _packet_header(fields)
+    positional, kv, pwd = _split_args(fields[6:])
 
     # PWD policy: if present, must be digits-only len 6..10
     if pwd and not validate_pwd(pwd):
         raise QC1ParseError("invalid PWD format")
 
-    hdr = QC1Header(model=model, dev=dev, seq=seq, ts=ts, cmd=cmd)
     return QC1Packet(hdr=hdr, positional=positional, kv=kv, pwd=pwd)
 
-
-# ---------------------------
-# Building frames
-# ---------------------------
+def _packet_from_payload(payload: str) -> QC1Packet:
+    head = _split_head(payload, 6)
+    # A PWD must be validated now, so such frames are split eagerly
+    if head is None or payload.find("PWD=", head[1]) != -1:
+        return _packet_from_fields(csv_split_q(payload))
+    fields, args_at = head
+    return QC1Packet(hdr=_packet_header(fields), src=payload, args_at=args_at)
 
 
 def parse_response(line: str) -> QC1Response:
@@ -290,11 +491,12 @@ def parse_response(line: str) -> QC1Response:
     calc = xor_checksum_ascii(payload)
     if calc.upper() != cs_hex.upper():
         raise QC1ParseError(f"checksum mismatch: have {cs_hex}, want {calc}")
-    fields = csv_split_q(payload)
-    if len(fields) < 4:
-        raise QC1ParseError("need at least 4 fields: prefix,dev,seq,ts")
-    prefix = fields[0]
-    dev = fields[1]
+    return _response_from_payload(payload)
+
+
+def _response_header(fields: List[str]) -> Tuple[str, str, int, int]:
+    prefix = _intern(fields[0])
+    dev = _intern(fields[1])
     try:
         seq = int(fields[2])
     except Exception:
@@ -303,7 +505,246 @@ def parse_response(line: str) -> QC1Response:
         ts = int(fields[3])
     except Exception:
         raise QC1ParseError("bad ts")
-    return QC1Response(prefix=prefix, dev=dev, seq=seq, ts=ts, fields=fields[4:])
+    return prefix, dev, seq, ts
+
+def _response_from_fields(fields: List[str]) -> QC1Response:
+    if len(fields) < 4:
+        raise QC1ParseError("need at least 4 fields: prefix,dev,seq,ts")
+    return QC1Response(*_response_header(fields), fields=fields[4:])
+
+def _response_from_payload(payload: str) -> QC1Response:
+    head = _split_head(payload, 4)
+    if head is None:
+        return _response_from_fields(csv_split_q(payload))
+    fields, fields_at = head
+    return QC1Response(*_response_header(fields), src=payload, fields_at=fields_at)
+
+
+# ---------------------------
+# Bytes-native parsing
+# ---------------------------
+
+# Header tokens (model/dev/cmd/prefix) repeat on every frame: map the raw bytes
+# straight to the interned str. Bounded so garbage input cannot grow it forever.
+_TOKEN_CACHE_MAX = 4096
+_tokens: Dict[bytes, str] = {}
+
+def _token(raw: bytes) -> str:
+    text = _tokens.get(raw)
+    if text is None:
+        text = _intern(raw.decode("ascii"))
+        if len(_tokens) < _TOKEN_CACHE_MAX:
+            _tokens[raw] = text
+    return text
+
+def _tail(src: Union[str, bytes], at: int) -> str:
+    # Lazy args/fields of the bytes parsers stay as bytes until first access
+    tail = src[at:]
+    return tail.decode("ascii") if isinstance(tail, bytes) else tail
+
+def _checked_payload(data: BytesLike, max_len: Optional[int] = None,
+                     start: int = 0, end: Optional[int] = None) -> bytes:
+    """Verify the checksum of the frame in data[start:end] and return its payload
+    (the bytes before '*'), checked to be ASCII.
+
+    Trailing CR/LF are skipped by index and the checksum is read straight from
+    the buffer; only the payload is copied. A memoryview is cut down to the
+    frame first, so a view over a large capture costs O(frame), not O(buffer)."""
+    if isinstance(data, memoryview):
+        data = bytes(data[start:end])
+        start, end = 0, None
+    elif not isinstance(data, (bytes, bytearray)):
+        raise QC1ParseError("frame must be bytes-like")
+    if end is None:
+        end = len(data)
+    while end > start and data[end - 1] in (10, 13):
+        end -= 1
+    if end == start:
+        raise QC1ParseError("empty line")
+    if max_len is not None and end - start > max_len:
+        raise QC1ParseError("line too long")
+
+    star = data.find(b"*", start, end)
+    if star == -1:
+        raise QC1ParseError("missing '*'")
+    if star + 2 >= end:
+        raise QC1ParseError("missing checksum hex")
+    hi = _HEX_NIBBLE.get(data[star + 1])
+    lo = _HEX_NIBBLE.get(data[star + 2])
+    payload = data[start:star]
+    if type(payload) is not bytes:
+        payload = bytes(payload)
+    calc = _xor_bytes(payload)
+    if hi is None or lo is None or (hi << 4 | lo) != calc:
+        have = data[star + 1: star + 3].decode("ascii", "replace")
+        raise QC1ParseError(f"checksum mismatch: have {have}, want {calc:02X}")
+    if not payload.isascii():
+        raise QC1ParseError("non-ascii payload")
+    return payload
+
+def _split_head_bytes(payload: bytes, n: int) -> Optional[Tuple[List[bytes], int]]:
+    """Bytes counterpart of _split_head(); None means "use the str slow path"
+    (fewer than `n` fields, empty or quoted header fields)."""
+    fields = payload.split(b",", n)
+    if len(fields) > n:
+        pos = len(payload) - len(fields.pop())
+    else:
+        pos = len(payload)
+    if len(fields) < n or b"" in fields or payload.find(b'"', 0, pos) != -1:
+        return None
+    return fields, pos
+
+def _response_head_bytes(payload: bytes) -> Tuple[str, str, int, int, int]:
+    """(prefix, dev, seq, ts, fields_at) of a verified response payload."""
+    head = _split_head_bytes(payload, 4)
+    if head is None:
+        text_head = _split_head(payload.decode("ascii"), 4)
+        if text_head is None:
+            raise QC1ParseError("need at least 4 fields: prefix,dev,seq,ts")
+        fields, fields_at = text_head
+        return (*_response_header(fields), fields_at)
+    (prefix, dev, seq, ts), fields_at = head
+    try:
+        seq = int(seq)
+    except ValueError:
+        raise QC1ParseError("bad seq")
+    try:
+        ts = int(ts)
+    except ValueError:
+        raise QC1ParseError("bad ts")
+    return _token(prefix), _token(dev), seq, ts, fields_at
+
+def parse_line_bytes(data: BytesLike) -> QC1Packet:
+    """Same as parse_line() but takes the raw frame (bytes/bytearray/memoryview).
+
+    Checksum, header split and number conversion run on the bytes; the args
+    are decoded only when first accessed."""
+    payload = _checked_payload(data, QC1_LINE_MAX)
+    head = _split_head_bytes(payload, 6)
+    # Quoted/empty header fields and PWD (validated eagerly) take the str path
+    if head is None or payload.find(b"PWD=", head[1]) != -1:
+        return _packet_from_payload(payload.decode("ascii"))
+    (sig, model, dev, seq, ts, cmd), args_at = head
+    if sig != b"QC1":
+        raise QC1ParseError("bad signature")
+    try:
+        seq = int(seq)
+    except ValueError:
+        raise QC1ParseError("bad seq")
+    if seq < 1 or seq > 9999:
+        raise QC1ParseError("seq out of range")
+    try:
+        ts = int(ts)
+    except ValueError:
+        ts = 0
+    hdr = QC1Header(model=_token(model), dev=_token(dev), seq=seq, ts=ts, cmd=_token(cmd))
+    return QC1Packet(hdr=hdr, src=payload, args_at=args_at)
+
+def parse_response_bytes(data: BytesLike) -> QC1Response:
+    """Same as parse_response() but takes the raw frame (bytes/bytearray/memoryview)."""
+    payload = _checked_payload(data)
+    prefix, dev, seq, ts, fields_at = _response_head_bytes(payload)
+    return QC1Response(prefix, dev, seq, ts, src=payload, fields_at=fields_at)
+
+def scan_response(data: BytesLike, start: int = 0,
+                  end: Optional[int] = None) -> Tuple[str, str, int, int, int, int]:
+    """Verify the response frame in data[start:end] without building objects.
+
+    Returns (prefix, dev, seq, ts, fields_start, fields_end) where the offsets
+    delimit the text after the header inside `data` (ready for csv_split_q).
+    Used by batch decoders that keep results in columns."""
+    payload = _checked_payload(data, None, start, end)
+    prefix, dev, seq, ts, fields_at = _response_head_bytes(payload)
+    return prefix, dev, seq, ts, start + fields_at, start + len(payload)
+
+
+# ---------------------------
+# Stream framing
+# ---------------------------
+
+class QC1FrameReader:
+    """Incremental CRLF framer for the serial RX stream.
+
+    Chunks are appended to a single bytearray and a scan cursor remembers how
+    far it has already been searched for '\n', so every byte is inspected once
+    no matter how the stream is chunked. Consumed bytes are released once per
+    feed() call.
+
+    Resync rules:
+      - a line growing past `max_frame` (QC1_LINE_MAX) is dropped up to the next
+        '\n' instead of being buffered forever;
+      - control/non-ASCII noise in front of a frame (line glitches, a device
+        rebooting mid-line) is stripped.
+    Everything discarded is accounted in `bytes_dropped`.
+    """
+
+    def __init__(self, max_frame: int = QC1_LINE_MAX) -> None:
+        self.max_frame = max_frame
+        self._buf = bytearray()
+        self._scan = 0
+        self._discarding = False
+        # counters
+        self.frames = 0
+        self.bytes_dropped = 0
+        self.overflows = 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes buffered for a frame that has not been terminated yet."""
+        return len(self._buf)
+
+    def reset(self) -> None:
+        self._buf.clear()
+        self._scan = 0
+        self._discarding = False
+
+    def feed(self, chunk: BytesLike) -> List[bytes]:
+        """Append `chunk` and return the complete frames it closed (CR/LF stripped)."""
+        buf = self._buf
+        buf += chunk
+        out: List[bytes] = []
+        start = 0
+        while True:
+            nl = buf.find(b"\n", self._scan)
+            if nl == -1:
+                break
+            if self._discarding:
+                self._discarding = False
+                self.bytes_dropped += nl + 1 - start
+            else:
+                end = nl - 1 if nl > start and buf[nl - 1] == 13 else nl
+                first = start
+                while first < end and not 0x20 < buf[first] < 0x7F:
+                    first += 1
+                self.bytes_dropped += first - start
+                if end - first > self.max_frame:
+                    self.overflows += 1
+                    self.bytes_dropped += end - first
+                elif end > first:
+                    out.append(bytes(buf[first:end]))
+                    self.frames += 1
+            start = self._scan = nl + 1
+
+        # Unterminated tail: drop it if it can no longer become a valid frame
+        tail = len(buf) - start
+        if self._discarding:
+            self.bytes_dropped += tail
+            start = len(buf)
+        elif tail > self.max_frame + 1:   # +1: a trailing CR may still be waiting for its LF
+            self.overflows += 1
+            self.bytes_dropped += tail
+            self._discarding = True
+            start = len(buf)
+        if start:
+            del buf[:start]
+        self._scan = len(buf)
+        return out
+
+
+# ---------------------------
+# Building frames
+# ---------------------------
+
 def build_command(model: str, dev: str, seq: int, ts: int, cmd: str,
                   *positional: str,
                   pwd: Optional[str] = None,
@@ -340,6 +781,9 @@ def _build_response(prefix: str, dev: str, seq: int, ts: int, *chunks: str) -> s
 def build_ok(dev: str, seq: int, ts: int, *chunks: str) -> str:
     return _build_response("OK", dev, seq, ts, *chunks)
 
+def build_stream_end(dev: str, seq: int, ts: int, *chunks: str) -> str:
+    return _build_response("OK", dev, seq, ts, QC1_STREAM_END, *chunks)
+
 def build_err(dev: str, seq: int, ts: int, code: int, reason: str = "") -> str:
     payload = f"{code},{reason}" if reason else f"{code}"
     return _build_response("ERR", dev, seq, ts, payload)
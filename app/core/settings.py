@@ -1,5 +1,5 @@
 ﻿import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 
 
@@ -10,6 +10,8 @@ class Settings:
     device_model: str = "ALR-LTE"
     device_id: str = "A1B2C3"
     device_password: str = "123456"
+    autobaud: bool = False  # detectar baudios con SYS.INFO? al conectar
+    baud_cache: dict[str, int] = field(default_factory=dict)  # n° de serie/puerto -> baudios detectados
 
     @classmethod
     def load(cls, path: str) -> "Settings":
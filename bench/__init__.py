@@ -0,0 +1,5 @@
+"""Micro-benchmarks for the QC1 protocol layer (run with ``python -m bench.<name>``).
+
+suite        full matrix over bench/corpus.py with JSON output and --compare
+bench_*      focused before/after comparisons for a single optimization
+"""
@@ -0,0 +1,100 @@
+"""
+bench_batch.py — per-line decode_response() loop vs columnar codec.decode_buffer().
+
+Both decode the same EVT flood capture (with a few corrupt lines mixed in) and
+report lines per second plus memory retained by the result. The two
+scan_response rows walk that capture frame by frame, once as bytes and once
+through a memoryview: both must scale with the frame, not the buffer.
+
+Run from the repository root:
+    python -m bench.bench_batch [--frames N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from app.comm import codec
+from app.core import qc1_proto
+
+from . import corpus
+
+
+def _per_line(buf: bytes) -> List[Any]:
+    out: List[Any] = []
+    for line in buf.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            out.append(codec.decode_response(line))
+        except qc1_proto.QC1ParseError:
+            pass
+    return out
+
+
+def _line_spans(buf: bytes) -> List[Tuple[int, int]]:
+    spans: List[Tuple[int, int]] = []
+    pos = 0
+    for line in buf.split(b"\n"):
+        if line.strip():
+            spans.append((pos, pos + len(line)))
+        pos += len(line) + 1
+    return spans
+
+
+def _scan_all(spans: List[Tuple[int, int]]) -> Callable[[qc1_proto.BytesLike], int]:
+    def run(buf: qc1_proto.BytesLike) -> int:
+        ok = 0
+        for start, end in spans:
+            try:
+                qc1_proto.scan_response(buf, start, end)
+                ok += 1
+            except (qc1_proto.QC1ParseError, ValueError):
+                pass
+        return ok
+    return run
+
+
+def _measure(fn: Callable[[Any], Any], buf: Any) -> Tuple[float, int]:
+    t0 = time.perf_counter()
+    fn(buf)
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn(buf)
+    kept = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del result
+    return elapsed, kept
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=200_000)
+    args = ap.parse_args()
+
+    frames = corpus.evt_flood(args.frames)
+    frames[::100] = corpus.corrupt(frames[::100])
+    buf = b"".join(frames)
+
+    batch = codec.decode_buffer(buf)
+    print(f"{len(batch)} frames decoded, {len(batch.errors)} rejected")
+    scan_all = _scan_all(_line_spans(buf))
+    cases: List[Tuple[str, Callable[[Any], Any], Any]] = [
+        ("decode_response loop", _per_line, buf),
+        ("decode_buffer", codec.decode_buffer, buf),
+        ("scan_response bytes", scan_all, buf),
+        ("scan_response view", scan_all, memoryview(buf)),
+    ]
+    for name, fn, data in cases:
+        elapsed, kept = _measure(fn, data)
+        print(f"{name:<22}{len(frames) / elapsed:>12,.0f} lines/s{kept / len(frames):>10.1f} B/line kept")
+
+
+if __name__ == "__main__":
+    main()
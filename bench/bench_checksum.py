@@ -0,0 +1,52 @@
+"""
+bench_checksum.py — per-byte XOR loop vs the bulk folding used by qc1_proto.
+
+Payload sizes go from a short command up to QC1_LINE_MAX. Every size is also
+cross-checked against the reference loop before timing.
+
+Run from the repository root:
+    python -m bench.bench_checksum [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import timeit
+
+from app.core import qc1_proto
+
+
+def _reference(data: bytes) -> int:
+    acc = 0
+    for b in data:
+        acc ^= b
+    return acc
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--number", type=int, default=20_000)
+    args = ap.parse_args()
+
+    print(f"{'bytes':>6}{'loop us':>10}{'bulk us':>10}{'chunked us':>12}{'speedup':>10}")
+    for size in (16, 48, 64, 256, 1024, qc1_proto.QC1_LINE_MAX):
+        data = os.urandom(size)
+        want = _reference(data)
+        assert qc1_proto._xor_bytes(data) == want
+
+        def chunked() -> int:
+            cs = qc1_proto.QC1Checksum()
+            for i in range(0, size, 256):
+                cs.update(data[i:i + 256])
+            return cs.value
+
+        assert chunked() == want
+        t_loop = timeit.timeit(lambda: _reference(data), number=args.number) / args.number * 1e6
+        t_bulk = timeit.timeit(lambda: qc1_proto._xor_bytes(data), number=args.number) / args.number * 1e6
+        t_chunk = timeit.timeit(chunked, number=args.number) / args.number * 1e6
+        print(f"{size:>6}{t_loop:>10.2f}{t_bulk:>10.2f}{t_chunk:>12.2f}{t_loop / t_bulk:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+bench_csv_split.py — differential check + micro-benchmark for csv_split_q.
+
+_reference() is the original character-by-character scanner. Before timing,
+randomly generated payloads over a hostile alphabet (commas, quotes, '=',
+spaces) are split by both implementations and must match exactly, including
+skipped empty fields and an unbalanced quote at the end.
+
+Run from the repository root:
+    python -m bench.bench_csv_split [--cases N] [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from typing import List
+
+from app.core import qc1_proto
+
+
+def _reference(s: str) -> List[str]:
+    out: List[str] = []
+    i, n = 0, len(s)
+    while i < n:
+        if s[i] == ",":
+            i += 1
+            continue
+        if s[i] == '"':
+            i += 1
+            start = i
+            while i < n and s[i] != '"':
+                i += 1
+            out.append(s[start:i])
+            i += 1
+            if i < n and s[i] == ",":
+                i += 1
+        else:
+            start = i
+            while i < n and s[i] != ",":
+                i += 1
+            out.append(s[start:i])
+            if i < n and s[i] == ",":
+                i += 1
+    return out
+
+
+def differential(cases: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    alphabet = ',,,"" a=B1'
+    for _ in range(cases):
+        s = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        got, want = qc1_proto.csv_split_q(s), _reference(s)
+        assert got == want, f"{s!r}: {got!r} != {want!r}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cases", type=int, default=200_000)
+    ap.add_argument("--number", type=int, default=20_000)
+    args = ap.parse_args()
+
+    differential(args.cases)
+    print(f"differential: {args.cases} random payloads identical")
+
+    payloads = {
+        "short": "OK,A1B2C3,0012,1700000000,FW=1.0.0",
+        "quoted": 'EVT,A1B2C3,0012,0,IN.CHANGE,"ZONE=Patio, norte",STATE=1',
+        "2KB json": "QC1,ALR-LTE,A1B2C3,0012,0,IO.OUTPUT.MAP,MAP=" + "[" + "{'out':1}" * 200 + "]",
+    }
+    print(f"{'payload':<10}{'loop us':>10}{'fast us':>10}{'speedup':>10}")
+    for name, s in payloads.items():
+        assert qc1_proto.csv_split_q(s) == _reference(s)
+        a = timeit.timeit(lambda: _reference(s), number=args.number) / args.number * 1e6
+        b = timeit.timeit(lambda: qc1_proto.csv_split_q(s), number=args.number) / args.number * 1e6
+        print(f"{name:<10}{a:>10.2f}{b:>10.2f}{a / b:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
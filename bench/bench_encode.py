@@ -0,0 +1,65 @@
+"""
+bench_encode.py — codec.encode_command vs a bound codec.CommandEncoder.
+
+Both sides encode the same AUDIO.PLAY/SYS.INFO? frames with rolling sequence
+numbers; the encoder output is checked byte for byte against encode_command.
+The "service encoder" row is the encoder as SerialCommandService builds it,
+with the password taken from each frame instead of bound up front.
+
+Runs of the three rows are interleaved and the best of --repeat is kept, so a
+noisy machine slows every row alike instead of skewing the ratio. Small
+batches with many repeats give a stable best case.
+
+Run from the repository root:
+    python -m bench.bench_encode [--frames N] [--repeat R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import List
+
+from app.comm import codec, registry
+from app.comm.models import CommandFrame, FrameHeader
+
+
+def _frames(n: int) -> List[CommandFrame]:
+    play = registry.get_command("AUDIO.PLAY")
+    info = registry.get_command("SYS.INFO?")
+    out: List[CommandFrame] = []
+    for i in range(n):
+        header = FrameHeader("ALR-LTE", "A1B2C3", i % 9999 + 1, 1700000000 + i, "123456")
+        if i % 2:
+            out.append(CommandFrame(header, play, [str(i % 8), "ON"], {"DUR": "30"}))
+        else:
+            out.append(CommandFrame(header, info))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=1_000)
+    ap.add_argument("--repeat", type=int, default=300)
+    args = ap.parse_args()
+
+    frames = _frames(args.frames)
+    encoder = codec.CommandEncoder("ALR-LTE", "A1B2C3", "123456")
+    for frame in frames[:100]:
+        assert encoder.encode_frame(frame) == codec.encode_command(frame).encode("ascii")
+
+    service = codec.CommandEncoder("ALR-LTE", "A1B2C3")
+    rows = [
+        ("encode_command", lambda: [codec.encode_command(f).encode("ascii") for f in frames]),
+        ("CommandEncoder.frame", lambda: [encoder.encode_frame(f) for f in frames]),
+        ("service encoder", lambda: [service.encode_frame(f) for f in frames]),
+    ]
+    best = [float("inf")] * len(rows)
+    for _ in range(args.repeat):
+        for i, (_name, run) in enumerate(rows):
+            best[i] = min(best[i], timeit.timeit(run, number=1))
+    for (name, _run), elapsed in zip(rows, best):
+        print(f"{name:<22}{len(frames) / elapsed:>12,.0f} frames/s  ({best[0] / elapsed:.2f}x)")
+
+if __name__ == "__main__":
+    main()
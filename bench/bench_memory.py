@@ -0,0 +1,98 @@
+"""
+bench_memory.py — retained bytes per decoded frame, before/after slotted models.
+
+"legacy" rebuilds what decode_response() produced before: dict-backed
+dataclasses, eagerly split fields copied into the envelope, no interning of the
+repeating header strings. "routed" keeps the current ResponseEnvelope objects
+and only reads prefix/device/sequence (the EVT routing case); "inspected" also
+reads `fields` on every frame.
+
+Frames are generated inside the measured loop, so the raw frame each envelope
+keeps alive is accounted for as well. Only memory still held after the loop
+is reported (tracemalloc).
+
+Run from the repository root (1M frames takes a while, tracemalloc is slow):
+    python -m bench.bench_memory [--frames N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence
+
+from app.comm import codec
+from app.core import qc1_proto
+
+
+@dataclass
+class _LegacyResponse:
+    prefix: str
+    dev: str
+    seq: int
+    ts: int
+    fields: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _LegacyEnvelope:
+    raw_line: str
+    prefix: str
+    device: str
+    sequence: int
+    timestamp: int
+    fields: Sequence[str]
+
+
+def _frame(i: int) -> bytes:
+    payload = b"EVT,%s,%04d,%d,IN.CHANGE,IN=%d,STATE=1" % (b"A1B2C3", i % 9999 + 1, 1700000000 + i, i % 4)
+    return payload + b"*" + qc1_proto.QC1Checksum(payload).hexdigest().encode("ascii")
+
+
+def _legacy(frame: bytes) -> object:
+    line = frame.decode("ascii", errors="ignore")
+    fields = qc1_proto.csv_split_q(line[: line.index("*")])
+    resp = _LegacyResponse(fields[0], fields[1], int(fields[2]), int(fields[3]), fields[4:])
+    return _LegacyEnvelope(line, resp.prefix, resp.dev, resp.seq, resp.ts, list(resp.fields))
+
+
+def _routed(frame: bytes) -> object:
+    env = codec.decode_response(frame)
+    env.prefix, env.device, env.sequence
+    return env
+
+
+def _inspected(frame: bytes) -> object:
+    env = codec.decode_response(frame)
+    env.fields
+    return env
+
+
+def _retained(build: Callable[[bytes], object], n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    keep = [build(_frame(i)) for i in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del keep
+    return used / n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    results: Dict[str, float] = {}
+    for name, build in (("legacy", _legacy), ("routed", _routed), ("inspected", _inspected)):
+        results[name] = _retained(build, args.frames)
+        print(f"{name:<10}{results[name]:>10.1f} bytes/frame", flush=True)
+    for name in ("routed", "inspected"):
+        print(f"{name} vs legacy: {100 * (1 - results[name] / results['legacy']):.0f}% less")
+
+
+if __name__ == "__main__":
+    main()
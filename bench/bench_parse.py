@@ -0,0 +1,72 @@
+"""
+bench_parse.py — str round-trip vs bytes-native QC1 frame parsing.
+
+The "str" column reproduces the serial RX path (codec.decode_response and
+decode_packet): decode the raw frame to ASCII, strip CR and hand the text to
+parse_line()/parse_response(). The "bytes" column feeds the very same frames to
+parse_line_bytes() and parse_response_bytes().
+
+Both columns pay the same per-byte checksum loop, which dominates; frame by
+frame the two stay within ~10% of each other, so the RX path keeps the str
+parsers. The bytes parsers pay off in scan_response()/decode_buffer(), which
+never build per-frame objects (see bench_batch.py).
+
+Run from the repository root:
+    python -m bench.bench_parse [--frames N] [--repeat R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Callable, List, Tuple
+
+from app.core import qc1_proto
+
+
+def _corpus(n: int) -> Tuple[List[bytes], List[bytes]]:
+    cmds: List[bytes] = []
+    resps: List[bytes] = []
+    for i in range(n):
+        seq = i % 9999 + 1
+        cmds.append(qc1_proto.build_command(
+            "ALR-LTE", "A1B2C3", seq, 1700000000 + i, "AUDIO.PLAY",
+            str(i % 8), "ON", DUR=30, pwd="123456").encode("ascii"))
+        resps.append(qc1_proto.build_evt(
+            "A1B2C3", seq, 1700000000 + i, "IN.CHANGE",
+            f"IN={i % 4}", "STATE=1", '"ZONE=Patio, norte"').encode("ascii"))
+    return cmds, resps
+
+
+def _legacy(parse: Callable[[str], object]) -> Callable[[bytes], object]:
+    def run(frame: bytes) -> object:
+        return parse(frame.decode("ascii", errors="ignore").rstrip("\r\n"))
+    return run
+
+
+def _measure(fn: Callable[[bytes], object], frames: List[bytes], repeat: int) -> float:
+    best = min(timeit.repeat(lambda: [fn(f) for f in frames], number=1, repeat=repeat))
+    return len(frames) / best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    cmds, resps = _corpus(args.frames)
+    cases = [
+        ("parse_line", cmds, _legacy(qc1_proto.parse_line), qc1_proto.parse_line_bytes),
+        ("parse_response", resps, _legacy(qc1_proto.parse_response), qc1_proto.parse_response_bytes),
+    ]
+    print(f"{'case':<16}{'str fps':>14}{'bytes fps':>14}{'speedup':>10}")
+    for name, frames, legacy, native in cases:
+        assert legacy(frames[0]) == native(frames[0])
+        a = _measure(legacy, frames, args.repeat)
+        b = _measure(native, frames, args.repeat)
+        print(f"{name:<16}{a:>14,.0f}{b:>14,.0f}{b / a:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
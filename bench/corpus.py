@@ -0,0 +1,140 @@
+"""
+corpus.py — synthetic but realistic QC1 frame corpora for the benchmarks.
+
+Every generator is deterministic (seeded) so runs are comparable between
+releases. Frames are returned as raw bytes including CRLF, exactly as they come
+out of SerialManager.data_received after framing.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from typing import Dict, List, Tuple
+
+from app.core import qc1_proto
+
+MODEL = "ALR-LTE"
+DEVICE = "A1B2C3"
+PASSWORD = "123456"
+TS0 = 1_700_000_000
+
+# (command, positional, keyword) tuples for build_command / encode_command
+CommandArgs = Tuple[str, Tuple[str, ...], Dict[str, str]]
+
+
+def _seq(i: int) -> int:
+    return i % 9999 + 1
+
+
+def output_map_json(target: int = qc1_proto.QC1_LINE_MAX - 160) -> str:
+    """Compact IO.OUTPUT.MAP JSON sized to fill a frame close to QC1_LINE_MAX."""
+    rows = []
+    i = 0
+    while True:
+        rows.append({"name": f"OUT{i}", "mode": "PULSE", "time": 5 + i % 30, "input": f"IN{i % 4}"})
+        text = json.dumps(rows, separators=(",", ":"))
+        if len(text) > target:
+            return json.dumps(rows[:-1], separators=(",", ":"))
+        i += 1
+
+
+def short_commands(n: int) -> List[CommandArgs]:
+    pool: List[CommandArgs] = [
+        ("SYS.INFO?", (), {}),
+        ("AUDIO.PLAY", ("4", "ON"), {"DUR": "30"}),
+        ("IO.OUTPUT.TRIGGER", ("SIRENA",), {"ACTION": "ACTIVAR"}),
+        ("LOGS.PULL?", (), {"LINES": "100"}),
+    ]
+    return [pool[i % len(pool)] for i in range(n)]
+
+
+def bulk_commands(n: int) -> List[CommandArgs]:
+    blob = output_map_json()
+    return [("IO.OUTPUT.MAP", (), {"MAP": blob}) for _ in range(n)]
+
+
+def _command_frames(args: List[CommandArgs]) -> List[bytes]:
+    return [
+        qc1_proto.build_command(MODEL, DEVICE, _seq(i), TS0 + i, cmd, *pos, pwd=PASSWORD, **kv).encode("ascii")
+        for i, (cmd, pos, kv) in enumerate(args)
+    ]
+
+
+def quoted_commands(n: int) -> List[bytes]:
+    return [
+        qc1_proto.build_command(
+            MODEL, DEVICE, _seq(i), TS0 + i, "NTF.TEMPLATE.SET", "alarma",
+            f'"BODY=Alarma en {{zona}}, nivel {i % 5}, llamar al 105"', pwd=PASSWORD,
+        ).encode("ascii")
+        for i in range(n)
+    ]
+
+
+def short_responses(n: int) -> List[bytes]:
+    return [
+        qc1_proto.build_ok(DEVICE, _seq(i), TS0 + i, f"MODEL={MODEL},DEV={DEVICE},FW=1.0.{i % 10}").encode("ascii")
+        for i in range(n)
+    ]
+
+
+def quoted_responses(n: int) -> List[bytes]:
+    return [
+        qc1_proto.build_evt(DEVICE, _seq(i), TS0 + i, "IN.CHANGE", f"IN={i % 4}", "STATE=1",
+                            f'"ZONE=Patio {i % 7}, puerta norte"').encode("ascii")
+        for i in range(n)
+    ]
+
+
+def evt_flood(n: int, devices: int = 16, seed: int = 7) -> List[bytes]:
+    """Bursty unsolicited EVT traffic from several panels sharing a gateway."""
+    rng = random.Random(seed)
+    names = ("IN.CHANGE", "RF.KEY", "RF.BATT", "PWR.AC", "NET.LTE")
+    devs = [f"D{k:05X}" for k in range(devices)]
+    return [
+        qc1_proto.build_evt(rng.choice(devs), _seq(i), TS0 + i, rng.choice(names),
+                            f"V={rng.randint(0, 999)}", f"RSSI=-{rng.randint(40, 110)}").encode("ascii")
+        for i in range(n)
+    ]
+
+
+def corrupt(frames: List[bytes], seed: int = 11) -> List[bytes]:
+    """Flip one payload byte, drop the checksum or truncate each frame."""
+    rng = random.Random(seed)
+    out: List[bytes] = []
+    for i, frame in enumerate(frames):
+        kind = i % 3
+        if kind == 0:
+            pos = rng.randrange(0, frame.index(b"*"))
+            out.append(frame[:pos] + bytes([frame[pos] ^ 0x01]) + frame[pos + 1:])
+        elif kind == 1:
+            out.append(frame[: frame.index(b"*")] + b"\r\n")
+        else:
+            out.append(frame[: len(frame) // 2] + b"\r\n")
+    return out
+
+
+def command_corpora(n: int) -> Dict[str, List[bytes]]:
+    return {
+        "short": _command_frames(short_commands(n)),
+        "json2k": _command_frames(bulk_commands(max(1, n // 10))),
+        "quoted": quoted_commands(n),
+        "corrupt": corrupt(_command_frames(short_commands(n))),
+    }
+
+
+def response_corpora(n: int) -> Dict[str, List[bytes]]:
+    return {
+        "short": short_responses(n),
+        "quoted": quoted_responses(n),
+        "evt_flood": evt_flood(n),
+        "corrupt": corrupt(short_responses(n)),
+    }
+
+
+__all__ = [
+    "MODEL", "DEVICE", "PASSWORD", "TS0",
+    "output_map_json", "short_commands", "bulk_commands", "quoted_commands",
+    "short_responses", "quoted_responses", "evt_flood", "corrupt",
+    "command_corpora", "response_corpora",
+]
@@ -0,0 +1,182 @@
+"""
+suite.py — QC1 protocol benchmark suite (qc1_proto + comm.codec).
+
+Measures, for every (operation, corpus) pair:
+  - fps:          frames per second, best of --repeat passes
+  - peak_bytes:   peak traced memory per frame during one pass that keeps every result
+  - kept_bytes:   memory still referenced per frame by those results afterwards
+                  (peak - kept = transient allocations)
+
+Operations: build_command, parse_line, parse_line_bytes, parse_response,
+parse_response_bytes, encode_command, CommandEncoder.encode_frame,
+decode_response (str and bytes) and QC1Dispatcher.dispatch. Corpora come from
+bench/corpus.py: short commands, 2 KB JSON IO.OUTPUT.MAP payloads, quoted
+fields, EVT floods and corrupt frames.
+
+Results can be written as JSON and compared against a previous run:
+    python -m bench.suite --json bench-1.1.0.json
+    python -m bench.suite --compare bench-1.0.0.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.__version__ import __version__
+from app.comm import codec, registry
+from app.comm.models import CommandFrame, FrameHeader
+from app.core import qc1_proto
+
+from . import corpus
+
+Case = Tuple[str, str, Callable[[Any], Any], List[Any]]
+
+
+def _tolerant(fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Corrupt corpora are expected to fail; time the rejection, not the traceback."""
+    def run(item: Any) -> Any:
+        try:
+            return fn(item)
+        except (qc1_proto.QC1ParseError, ValueError):
+            return None
+    return run
+
+
+def _decoded(frames: List[bytes]) -> List[str]:
+    return [f.decode("ascii").rstrip("\r\n") for f in frames]
+
+
+def _command_frames(args: Iterable[corpus.CommandArgs]) -> List[CommandFrame]:
+    out: List[CommandFrame] = []
+    for i, (name, pos, kv) in enumerate(args):
+        header = FrameHeader(corpus.MODEL, corpus.DEVICE, i % 9999 + 1, corpus.TS0 + i, corpus.PASSWORD)
+        out.append(CommandFrame(header, registry.get_command(name), list(pos), dict(kv)))
+    return out
+
+
+def build_cases(n: int) -> List[Case]:
+    cases: List[Case] = []
+
+    def build(args: corpus.CommandArgs) -> str:
+        name, pos, kv = args
+        return qc1_proto.build_command(corpus.MODEL, corpus.DEVICE, 12, corpus.TS0, name, *pos,
+                                       pwd=corpus.PASSWORD, **kv)
+
+    cases.append(("build_command", "short", build, corpus.short_commands(n)))
+    cases.append(("build_command", "json2k", build, corpus.bulk_commands(max(1, n // 10))))
+
+    for name, frames in corpus.command_corpora(n).items():
+        cases.append(("parse_line", name, _tolerant(qc1_proto.parse_line), _decoded(frames)))
+        cases.append(("parse_line_bytes", name, _tolerant(qc1_proto.parse_line_bytes), frames))
+
+    for name, frames in corpus.response_corpora(n).items():
+        cases.append(("parse_response", name, _tolerant(qc1_proto.parse_response), _decoded(frames)))
+        cases.append(("parse_response_bytes", name, _tolerant(qc1_proto.parse_response_bytes), frames))
+        cases.append(("decode_response", name, _tolerant(codec.decode_response), _decoded(frames)))
+        cases.append(("decode_response_bytes", name, _tolerant(codec.decode_response), frames))
+
+    encoder = codec.CommandEncoder(corpus.MODEL, corpus.DEVICE, corpus.PASSWORD)
+    for name, args in (("short", corpus.short_commands(n)), ("json2k", corpus.bulk_commands(max(1, n // 10)))):
+        frames = _command_frames(args)
+        cases.append(("encode_command", name, codec.encode_command, frames))
+        cases.append(("CommandEncoder.encode_frame", name, encoder.encode_frame, frames))
+
+    disp = qc1_proto.make_default_dispatcher()
+    packets = [
+        qc1_proto.parse_line(qc1_proto.build_command(corpus.MODEL, corpus.DEVICE, i % 9999 + 1, 0, cmd, *pos, **kw))
+        for i, (cmd, pos, kw) in enumerate(
+            [("SYS.INFO?", (), {}), ("AUDIO.PLAY", ("4", "ON"), {"DUR": "30", "pwd": corpus.PASSWORD}),
+             ("AUDIO.PLAY", ("4", "ON"), {"DUR": "30"}), ("NOPE.CMD", (), {})] * max(1, n // 4)
+        )
+    ]
+    cases.append(("QC1Dispatcher.dispatch", "mixed", disp.dispatch, packets))
+    return cases
+
+
+def _fps(fn: Callable[[Any], Any], items: List[Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    return len(items) / best if best > 0 else float("inf")
+
+
+def _memory(fn: Callable[[Any], Any], items: List[Any]) -> Tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept = [fn(item) for item in items]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    n = len(items)
+    return (peak - base) / n, (current - base) / n
+
+
+def run(n: int, repeat: int, only: Optional[str] = None) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    for op, name, fn, items in build_cases(n):
+        key = f"{op}/{name}"
+        if only and only not in key:
+            continue
+        fps = _fps(fn, items, repeat)
+        peak, kept = _memory(fn, items)
+        results.append({"case": key, "frames": len(items), "fps": round(fps, 1),
+                        "peak_bytes": round(peak, 1), "kept_bytes": round(kept, 1)})
+        print(f"{key:<44}{fps:>12,.0f} fps{peak:>10.0f} B peak{kept:>10.0f} B kept", flush=True)
+    return {
+        "meta": {
+            "app_version": __version__,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "frames": n,
+            "repeat": repeat,
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    old = {r["case"]: r for r in previous.get("results", [])}
+    print(f"\n{'case':<44}{'fps old':>12}{'fps new':>12}{'delta':>9}{'kept old':>10}{'kept new':>10}")
+    for r in current["results"]:
+        before = old.get(r["case"])
+        if before is None:
+            print(f"{r['case']:<44}{'-':>12}{r['fps']:>12,.0f}{'new':>9}")
+            continue
+        delta = (r["fps"] / before["fps"] - 1) * 100 if before["fps"] else 0.0
+        print(f"{r['case']:<44}{before['fps']:>12,.0f}{r['fps']:>12,.0f}{delta:>+8.1f}%"
+              f"{before['kept_bytes']:>10.0f}{r['kept_bytes']:>10.0f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=5_000, help="frames per corpus (json2k uses a tenth)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", help="substring filter on 'operation/corpus'")
+    ap.add_argument("--json", metavar="PATH", help="write machine-readable results")
+    ap.add_argument("--compare", metavar="PATH", help="previous --json output to compare against")
+    args = ap.parse_args()
+
+    report = run(args.frames, args.repeat, args.only)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(report, json.load(fh))
+
+
+if __name__ == "__main__":
+    main()